@@ -0,0 +1,82 @@
+import hashlib
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+from benchmarks.synthetic import SyntheticHH
+
+
+class HHStubServer:
+    """Локальный HTTP-сервер, отдающий синтетические страницы /vacancies вместо api.hh.ru.
+    throttle_every > 0 включает ответ 429 на каждый throttle_every-й запрос для проверки повторов,
+    etags=True - заголовок ETag и ответ 304 на условные запросы с совпадающим If-None-Match"""
+
+    def __init__(self, synthetic: SyntheticHH, host: str = '127.0.0.1', port: int = 0, throttle_every: int = 0,
+                 etags: bool = False):
+        self.synthetic = synthetic
+        self.throttle_every = throttle_every
+        self.etags = etags
+        self.requests_count = 0
+        self.not_modified_count = 0
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._make_handler())
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/vacancies"
+
+    def _make_handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_GET(self):
+                with stub._lock:
+                    stub.requests_count += 1
+                    throttled = stub.throttle_every and stub.requests_count % stub.throttle_every == 0
+                if throttled:
+                    self._send(429, b'{}', {'Retry-After': '0'})
+                    return
+                query = parse_qs(urlparse(self.path).query)
+                page = stub.synthetic.page(int(query.get('page', ['0'])[0]),
+                                           int(query.get('per_page', ['20'])[0]),
+                                           query.get('employer_id'),
+                                           query.get('date_from', [None])[0],
+                                           query.get('date_to', [None])[0])
+                body = json.dumps(page, ensure_ascii=False).encode('utf-8')
+                if not stub.etags:
+                    self._send(200, body)
+                    return
+                etag = f'"{hashlib.md5(body).hexdigest()}"'
+                if self.headers.get('If-None-Match') == etag:
+                    with stub._lock:
+                        stub.not_modified_count += 1
+                    self._send(304, b'', {'ETag': etag})
+                    return
+                self._send(200, body, {'ETag': etag})
+
+            def _send(self, status: int, body: bytes, headers: dict = None):
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                for key, value in (headers or {}).items():
+                    self.send_header(key, value)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+    def __enter__(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._server.shutdown()
+        self._server.server_close()
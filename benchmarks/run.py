@@ -0,0 +1,203 @@
+"""Бенчмарки этапов конвейера: загрузка страниц с локальной заглушки HH, разбор вакансий,
+фильтры и сортировки Utils, заполнение БД. Результаты сохраняются в JSON для сравнения между коммитами.
+
+Запуск: python -m benchmarks.run --vacancies 20000 --output bench_results.json [--db]
+"""
+import argparse
+import gc
+import json
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+from benchmarks.synthetic import SyntheticHH
+from src.keyword_index import KeywordIndex
+from src.salary_index import SalaryIndex
+from src.utils import Utils
+from src.vacancy import Vacancy
+
+
+def measure(name: str, func, items_count: int, repeat: int = 3, setup=None) -> dict:
+    """Лучшее время из repeat запусков func и пиковая память отдельного запуска под tracemalloc
+    (tracemalloc замедляет код, поэтому время и память измеряются раздельно).
+    setup, если задан, вызывается перед каждым запуском и в замер не входит"""
+    timings = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        gc.collect()
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+
+    if setup:
+        setup()
+    gc.collect()
+    tracemalloc.start()
+    func()
+    _, peak_memory = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    seconds = min(timings)
+    result = {'name': name, 'items': items_count, 'seconds': seconds,
+              'items_per_second': items_count / seconds if seconds else None,
+              'peak_memory_bytes': peak_memory}
+    print(f"{name:<32} {seconds * 1000:>10.2f} мс {result['items_per_second'] or 0:>14.0f} шт/с "
+          f"{peak_memory / 1024 / 1024:>8.2f} МБ")
+    return result
+
+
+def bench_fetch(synthetic: SyntheticHH, repeat: int) -> list[dict]:
+    from benchmarks.hh_stub import HHStubServer
+    from src.head_hunter_api import HeadHunterAPI
+
+    employer_ids = synthetic.employer_ids()
+
+    def fetch():
+        with HeadHunterAPI(requests_per_second=None) as hh_api:
+            hh_api.url = stub.url
+            return hh_api.load_vacancies(params={'employer_id': employer_ids})
+
+    with HHStubServer(synthetic) as stub:
+        return [measure('fetch_load_vacancies', fetch, synthetic.vacancies_count, repeat)]
+
+
+def bench_parse(raw_vacancies: list[dict], repeat: int) -> list[dict]:
+    return [measure('parse_cast_to_object_list', lambda: Vacancy.cast_to_object_list(raw_vacancies),
+                    len(raw_vacancies), repeat)]
+
+
+def bench_parse_parallel(raw_pages: list[bytes], items_count: int, repeat: int, workers: list[int]) -> list[dict]:
+    """Разбор исходных страниц (bytes) в пуле из разного числа процессов. Пул создается заранее,
+    чтобы время запуска процессов не входило в замер"""
+    from src.parallel_parser import ParallelParser
+
+    pages = [({'page': page_num}, raw_page) for page_num, raw_page in enumerate(raw_pages)]
+    results = []
+    for max_workers in workers:
+        with ParallelParser(max_workers) as parser:
+            parser.parse(pages[:max_workers])
+            results.append(measure(f'parse_parallel_{max_workers}', lambda: parser.parse(pages),
+                                   items_count, repeat))
+    return results
+
+
+def bench_utils(vacancies: list[Vacancy], repeat: int) -> list[dict]:
+    count = len(vacancies)
+    keyword_index = KeywordIndex(vacancies)
+    salary_index = SalaryIndex(vacancies)
+    return [
+        measure('utils_filter_vacancies', lambda: Utils.filter_vacancies(vacancies, ['python', 'sql']),
+                count, repeat),
+        measure('keyword_index_build', lambda: KeywordIndex(vacancies), count, repeat),
+        measure('keyword_index_search', lambda: keyword_index.search(['python', 'sql']), count, repeat),
+        measure('utils_get_vacancies_by_salary',
+                lambda: Utils.get_vacancies_by_salary(vacancies, range(100000, 150001)), count, repeat),
+        measure('salary_index_build', lambda: SalaryIndex(vacancies), count, repeat),
+        measure('salary_index_overlapping', lambda: salary_index.overlapping(100000, 150000), count, repeat),
+        measure('utils_sort_top', lambda: Utils.get_top_vacancies(Utils.sort_vacancies_by_salary(vacancies), 10),
+                count, repeat),
+        measure('salary_index_top', lambda: salary_index.top(10), count, repeat),
+    ]
+
+
+def bench_db(vacancies: list[Vacancy], repeat: int, db_name: str) -> list[dict]:
+    """Заполнение таблиц в отдельной БД db_name. Перед каждым запуском таблицы создаются заново
+    (sync_database фиксирует изменения, поэтому откатить его нельзя), после замеров удаляются"""
+    from config import config
+    from src.db_manager import DbManager
+
+    params = config()
+    with DbManager(db_name=db_name, params=params) as db_manager:
+        db_manager.create_db_if_not_exists()
+
+    results = []
+    with DbManager(db_name=db_name, params={**params, 'dbname': db_name}) as db_manager:
+        connection = db_manager._connection
+
+        def drop_tables():
+            with connection.cursor() as cur:
+                cur.execute("DROP TABLE IF EXISTS vacancies, employers")
+            connection.commit()
+
+        def reset_tables():
+            drop_tables()
+            db_manager.creat_employers_table()
+            db_manager.create_vacancies_table()
+            connection.commit()
+
+        def run(fill):
+            def load():
+                try:
+                    fill(vacancies)
+                finally:
+                    connection.rollback()
+            return load
+
+        try:
+            for name, fill in (('db_fill_database', db_manager.fill_database),
+                               ('db_load_database', db_manager.load_database),
+                               ('db_sync_database', db_manager.sync_database)):
+                results.append(measure(name, run(fill), len(vacancies), repeat, setup=reset_tables))
+        finally:
+            connection.rollback()
+            drop_tables()
+    return results
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ''
+
+
+def main(argv: list = None) -> dict:
+    parser = argparse.ArgumentParser(description='Бенчмарки этапов загрузки и обработки вакансий')
+    parser.add_argument('--vacancies', type=int, default=20000, help='число синтетических вакансий')
+    parser.add_argument('--employers', type=int, default=200, help='число работодателей')
+    parser.add_argument('--employer-skew', type=float, default=1.2, help='показатель распределения Ципфа')
+    parser.add_argument('--salary-median', type=int, default=120000)
+    parser.add_argument('--salary-share', type=float, default=0.6, help='доля вакансий с указанной зарплатой')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--parse-workers', type=int, nargs='*', default=[],
+                        help='число процессов для бенчмарка параллельного разбора, например: 1 2 4')
+    parser.add_argument('--fetch', action='store_true', help='загрузка страниц с локальной заглушки HH')
+    parser.add_argument('--db', action='store_true', help='заполнение таблиц в локальном PostgreSQL')
+    parser.add_argument('--db-name', default='hh_bench')
+    parser.add_argument('--output', default='bench_results.json')
+    args = parser.parse_args(argv)
+
+    synthetic = SyntheticHH(args.vacancies, args.employers, args.employer_skew,
+                            salary_median=args.salary_median, salary_share=args.salary_share)
+    raw_vacancies = synthetic.vacancies()
+    vacancies = Vacancy.cast_to_object_list(raw_vacancies)
+
+    results = []
+    if args.fetch:
+        results += bench_fetch(synthetic, args.repeat)
+    results += bench_parse(raw_vacancies, args.repeat)
+    if args.parse_workers:
+        raw_pages = [json.dumps({'items': raw_vacancies[start:start + 100]}, ensure_ascii=False).encode('utf-8')
+                     for start in range(0, len(raw_vacancies), 100)]
+        results += bench_parse_parallel(raw_pages, len(raw_vacancies), args.repeat, args.parse_workers)
+    results += bench_utils(vacancies, args.repeat)
+    if args.db:
+        results += bench_db(vacancies, args.repeat, args.db_name)
+
+    report = {
+        'meta': {'commit': git_commit(), 'timestamp': datetime.now().isoformat(),
+                 'python': sys.version.split()[0], 'platform': platform.platform(),
+                 'params': vars(args)},
+        'results': results,
+    }
+    with open(args.output, 'w', encoding='utf-8') as file:
+        json.dump(report, file, ensure_ascii=False, indent=2)
+    print(f"\nРезультаты сохранены в {args.output}")
+    return report
+
+
+if __name__ == '__main__':
+    main()
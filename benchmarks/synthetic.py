@@ -0,0 +1,91 @@
+import math
+import random
+from datetime import datetime, timedelta
+
+
+class SyntheticHH:
+    """Генератор синтетических страниц выдачи HH /vacancies с заданным объемом,
+    перекосом распределения вакансий по работодателям и распределением зарплат"""
+
+    def __init__(self, vacancies_count: int = 10000, employers_count: int = 100, employer_skew: float = 1.2,
+                 salary_median: int = 120000, salary_sigma: float = 0.5, salary_share: float = 0.6,
+                 period_days: int = 30, seed: int = 42):
+        self.vacancies_count = vacancies_count
+        self.employers_count = employers_count
+        self.employer_skew = employer_skew
+        self.salary_median = salary_median
+        self.salary_sigma = salary_sigma
+        self.salary_share = salary_share
+        self.seed = seed
+        # даты публикации равномерно распределены по последним period_days дням
+        self._published_base = datetime.now().replace(minute=0, second=0, microsecond=0)
+        self._published_step = timedelta(days=period_days) / max(vacancies_count, 1)
+        self._indices_cache = {}
+        # веса работодателей по закону Ципфа: несколько крупных работодателей и длинный хвост мелких
+        self._employer_weights = [1 / (rank ** employer_skew) for rank in range(1, employers_count + 1)]
+        self._employer_ids = [1000000 + rank for rank in range(employers_count)]
+        self._employer_of = random.Random(seed).choices(self._employer_ids, self._employer_weights,
+                                                         k=vacancies_count)
+
+    _TITLES = ('Python разработчик', 'Java Developer', 'Аналитик данных', 'Менеджер проектов',
+               'Backend Engineer', 'Frontend разработчик', 'DevOps инженер', 'QA Engineer',
+               'Системный администратор', 'Product Manager')
+    _WORDS = ('опыт', 'работы', 'знание', 'SQL', 'Django', 'Docker', 'Linux', 'английский', 'команда',
+              'разработка', 'сервисов', 'поддержка', 'API', 'PostgreSQL', 'Kafka', 'тестирование')
+
+    def vacancy(self, idx: int) -> dict:
+        """Синтетическая вакансия с номером idx в формате выдачи HH"""
+        rnd = random.Random(self.seed * 1000003 + idx)
+        employer_id = self._employer_of[idx]
+        salary = None
+        if rnd.random() < self.salary_share:
+            base = int(rnd.lognormvariate(math.log(self.salary_median), self.salary_sigma)) // 1000 * 1000
+            salary = {'from': base if rnd.random() < 0.8 else None,
+                      'to': base + rnd.randint(0, 10) * 10000 if rnd.random() < 0.6 else None,
+                      'currency': 'RUR', 'gross': False}
+            if salary['from'] is None and salary['to'] is None:
+                salary['from'] = base
+        vacancy_id = 50000000 + idx
+        return {
+            'published_at': self.published_at(idx).isoformat(),
+            'id': str(vacancy_id),
+            'name': f"{rnd.choice(self._TITLES)} {rnd.choice(('Junior', 'Middle', 'Senior', ''))}".strip(),
+            'url': f"https://api.hh.ru/vacancies/{vacancy_id}?host=hh.ru",
+            'salary': salary,
+            'employer': {'id': str(employer_id), 'name': f"Компания {employer_id}"},
+            'snippet': {'requirement': ' '.join(rnd.choices(self._WORDS, k=12)),
+                        'responsibility': ' '.join(rnd.choices(self._WORDS, k=12))},
+        }
+
+    def published_at(self, idx: int) -> datetime:
+        return self._published_base - self._published_step * idx
+
+    def vacancies(self) -> list[dict]:
+        return [self.vacancy(idx) for idx in range(self.vacancies_count)]
+
+    def employer_ids(self) -> list[str]:
+        """Идентификаторы работодателей, у которых есть вакансии, в виде параметра employer_id запроса"""
+        return [str(employer_id) for employer_id in sorted(set(self._employer_of))]
+
+    def _indices(self, employer_ids: tuple, date_from: str, date_to: str) -> list[int]:
+        key = (employer_ids, date_from, date_to)
+        if key not in self._indices_cache:
+            wanted = {int(employer_id) for employer_id in employer_ids}
+            moment_from = datetime.fromisoformat(date_from) if date_from else datetime.min
+            moment_to = datetime.fromisoformat(date_to) if date_to else datetime.max
+            self._indices_cache[key] = [idx for idx, employer_id in enumerate(self._employer_of)
+                                        if (not wanted or employer_id in wanted)
+                                        and moment_from <= self.published_at(idx) <= moment_to]
+        return self._indices_cache[key]
+
+    def page(self, page: int, per_page: int, employer_ids: list = None,
+             date_from: str = None, date_to: str = None) -> dict:
+        """Страница выдачи с полями found/pages/page/per_page/items,
+        с фильтрами по работодателям и окну дат публикации"""
+        indices = self._indices(tuple(sorted(employer_ids or ())), date_from, date_to)
+        found = len(indices)
+        # как и HH, выдача не глубже 2000 элементов
+        available = min(found, 2000)
+        items = [self.vacancy(idx) for idx in indices[page * per_page:min((page + 1) * per_page, available)]]
+        return {'found': found, 'pages': math.ceil(available / per_page) if per_page else 0,
+                'page': page, 'per_page': per_page, 'items': items}
@@ -5,6 +5,9 @@ ROOT_PATH = os.path.dirname(__file__)
 DATA_DIR_PATH = os.path.join(ROOT_PATH, 'data')
 DB_CONN_FILE_PATH = os.path.join(DATA_DIR_PATH, "database.ini")
 CONFIG_SQL_FILE_PATH = os.path.join(DATA_DIR_PATH, DB_CONN_FILE_PATH)
+HH_CACHE_DIR_PATH = os.path.join(DATA_DIR_PATH, 'hh_cache')
+HH_SNAPSHOTS_DIR_PATH = os.path.join(DATA_DIR_PATH, 'hh_snapshots')
+SQLITE_DB_FILE_PATH = os.path.join(DATA_DIR_PATH, 'vacancies.sqlite3')
 
 
 def config(filename=CONFIG_SQL_FILE_PATH, section="postgresql"):
@@ -1,6 +1,17 @@
+import argparse
+import logging
+from itertools import chain
 from src.head_hunter_api import HeadHunterAPI
-from config import config
+from src.report_exporter import ReportExporter
+from config import config, HH_CACHE_DIR_PATH, HH_SNAPSHOTS_DIR_PATH, SQLITE_DB_FILE_PATH
+from src.crawl_snapshot import SnapshotStore
+from src.parallel_parser import ParallelParser
 from src.db_manager import DbManager
+from src.metrics import metrics, JsonFileSink, LogSink, PrometheusTextSink
+from src.query_cache import QueryCache
+from src.response_cache import ResponseCache
+from src.sqlite_db_manager import SqliteDbManager
+from src.storage_backend import StorageBackend
 import psycopg2
 
 
@@ -16,32 +27,61 @@ EMPLOYERS_DICT = {"5856776": "Зерокодер",
                   "3365917": "Cleverest Technologies"}
 
 
-def main():
-    """Метод загрузки вакансий с сайта HH от заданных компаний и вывода информации по ним.
-     Точка входа в программу."""
+def create_storage(storage: str) -> StorageBackend:
+    """Создает хранилище вакансий: 'postgresql' (по умолчанию) или встроенное 'sqlite'"""
+    query_cache = QueryCache()
+    if storage == 'sqlite':
+        return SqliteDbManager(SQLITE_DB_FILE_PATH, query_cache=query_cache)
+    return DbManager(db_name='my_new_db', params=config(), query_cache=query_cache)
 
-    print('Загрузка вакансий следующих компаний:\n' + ('"\n"'.join(EMPLOYERS_DICT.values())) + "\n")
 
-    hh_api = HeadHunterAPI()
-    vacancies = hh_api.load_vacancies(params={'employer_id': EMPLOYERS_DICT.keys()})
+def main(rebuild: bool = False, storage: str = 'postgresql', snapshot: str = None, parse_workers: int = None,
+         cache: bool = False, offline: bool = False):
+    """Метод загрузки вакансий с сайта HH от заданных компаний и вывода информации по ним.
+     Точка входа в программу. По умолчанию таблицы синхронизируются инкрементально,
+     при rebuild=True БД и таблицы пересоздаются заново. Каждая загрузка сохраняется в архив снимков;
+     snapshot - имя снимка (или latest), из которого таблицы заполняются без обращения к HH.
+     parse_workers - число процессов для разбора страниц (по умолчанию разбор в текущем процессе).
+     cache - использовать дисковый кэш ответов HH, offline - воспроизводить загрузку только из кэша."""
+
+    snapshot_store = SnapshotStore(HH_SNAPSHOTS_DIR_PATH)
+    if snapshot == 'latest':
+        snapshot = snapshot_store.latest()
+    if snapshot:
+        print(f"Загрузка вакансий из снимка {snapshot}\n")
+    else:
+        print('Загрузка вакансий следующих компаний:\n' + ('"\n"'.join(EMPLOYERS_DICT.values())) + "\n")
+
+    response_cache = ResponseCache(HH_CACHE_DIR_PATH, offline=offline) if cache or offline else None
 
-    params = config()
     try:
 
-        with DbManager(db_name='my_new_db', params=params) as db_manager:
-
-            db_manager.drop_db()
-            db_manager.create_db()
-
-            db_manager.creat_employers_table()
-            print(f"Создана таблица employers")
-
-            db_manager.create_vacancies_table()
-            print(f"Создана таблица vacancies")
-
-            # заполнение таблиц БД
-            db_manager.fill_database(vacancies)
-            print(f"Таблицы заполнены данным")
+        # без parse_workers пул процессов не запускается, разбор идет в потоке загрузки
+        with ParallelParser(parse_workers or 1) as parser, \
+                HeadHunterAPI(cache=response_cache, snapshot_store=snapshot_store,
+                              parser=parser if parse_workers else None) as hh_api, \
+                create_storage(storage) as db_manager:
+
+            db_manager.prepare_storage(rebuild)
+
+            # строки вакансий передаются в БД без создания объектов Vacancy
+            if snapshot:
+                rows = chain.from_iterable(snapshot_store.load(snapshot).iter_rows())
+            else:
+                # заполнение таблиц БД по мере загрузки страниц
+                rows = chain.from_iterable(hh_api.iter_rows(params={'employer_id': EMPLOYERS_DICT.keys()}))
+            if rebuild:
+                db_manager.load_rows(rows)
+                print(f"Таблицы заполнены данным")
+            else:
+                sync_stats = db_manager.sync_rows(rows)
+                print(f"Таблицы синхронизированы: загружено {sync_stats['loaded']}, "
+                      f"изменено {sync_stats['vacancies_changed']}, снято {sync_stats['vacancies_removed']}")
+            if parser.errors:
+                print(f"Пропущено некорректных вакансий и страниц: {len(parser.errors)}, "
+                      f"по типам ошибок: {parser.error_report()['errors_by_type']}")
+            if hh_api.last_snapshot:
+                print(f"Загрузка сохранена в снимок {hh_api.last_snapshot}")
 
             db_manager.print_info()
 
@@ -49,5 +89,99 @@ def main():
         print(error)
 
 
+def export_reports(reports: list[tuple[str, dict]], fmt: str = 'csv', output_dir: str = None,
+                   storage: str = 'postgresql'):
+    """Неинтерактивная выгрузка отчетов по уже загруженным данным (например, из cron).
+    reports - список пар (номер отчета, dict аргументов), например [("1", {}), ("5", {"keyword": "Python"})]"""
+    with create_storage(storage) as db_manager:
+        for case_num, rows_count in ReportExporter(db_manager, fmt, output_dir).export(reports):
+            if output_dir:
+                print(f"Отчет {case_num}: выгружено строк {rows_count}")
+
+
+def diff_snapshots(old_name: str, new_name: str):
+    """Выводит изменения между двумя снимками загрузок: новые, снятые вакансии и изменения зарплаты"""
+    snapshot_store = SnapshotStore(HH_SNAPSHOTS_DIR_PATH)
+    changes = snapshot_store.diff(old_name, new_name)
+    print(f"Новые вакансии ({len(changes['new'])}):")
+    [print(f"{vacancy.id}: {vacancy.name}") for vacancy in changes['new'].iter_vacancies()]
+    print(f"\nСнятые вакансии ({len(changes['removed'])}):")
+    [print(f"{vacancy.id}: {vacancy.name}") for vacancy in changes['removed'].iter_vacancies()]
+    print(f"\nИзменилась зарплата ({len(changes['salary_changed'])}):")
+    [print(f"{vacancy_id}: {old_from}-{old_to} -> {new_from}-{new_to}")
+     for vacancy_id, old_from, old_to, new_from, new_to in changes['salary_changed']]
+
+
+def parse_reports(values: list[str]) -> list[tuple[str, dict]]:
+    """Разбирает отчеты командной строки вида 1 2 5:python,django -> [("1", {}), ("2", {}), ("5", {...})].
+    Неизвестный номер отчета - ValueError"""
+    reports = []
+    for value in values:
+        case_num, _, keywords = value.partition(':')
+        if case_num not in ReportExporter.REPORTS:
+            raise ValueError(f"Неизвестный номер отчета {case_num}, допустимые номера: "
+                             f"{', '.join(ReportExporter.REPORTS)}")
+        reports.append((case_num, {'keywords': keywords.split(',')} if keywords else {}))
+    return reports
+
+
+def enable_metrics(json_path: str = None, prom_path: str = None, log: bool = False, explain: bool = False) -> bool:
+    """Включает сбор метрик, если задан хотя бы один приемник. Возвращает True, если метрики включены"""
+    sinks = []
+    if log:
+        logging.basicConfig(level=logging.INFO, format='%(message)s')
+        sinks.append(LogSink())
+    if json_path:
+        sinks.append(JsonFileSink(json_path))
+    if prom_path:
+        sinks.append(PrometheusTextSink(prom_path))
+    if not sinks:
+        return False
+    metrics.enable(sinks, explain)
+    return True
+
+
 if __name__ == '__main__':
-    main()
+    parser = argparse.ArgumentParser(description='Загрузка вакансий HH и отчеты по ним')
+    parser.add_argument('--storage', choices=('postgresql', 'sqlite'), default='postgresql')
+    parser.add_argument('--rebuild', action='store_true', help='пересоздать БД вместо синхронизации')
+    parser.add_argument('--batch', nargs='+', metavar='REPORT',
+                        help='выгрузить отчеты без загрузки и диалога, например: 1 2 4 5:python,django')
+    parser.add_argument('--format', choices=ReportExporter.FORMATS, default='csv')
+    parser.add_argument('--output-dir', help='каталог для файлов отчетов (по умолчанию stdout)')
+    parser.add_argument('--snapshot', metavar='NAME',
+                        help='заполнить таблицы из снимка прошлой загрузки (имя или latest) без обращения к HH')
+    parser.add_argument('--cache', action='store_true',
+                        help='кэшировать ответы HH на диске и ревалидировать их при повторных загрузках')
+    parser.add_argument('--offline', action='store_true',
+                        help='воспроизвести прошлую загрузку из кэша ответов без обращения к HH')
+    parser.add_argument('--parse-workers', type=int, metavar='N',
+                        help='разбирать страницы HH в пуле из N процессов')
+    parser.add_argument('--diff-snapshots', nargs=2, metavar=('OLD', 'NEW'), help='сравнить два снимка загрузок')
+    parser.add_argument('--metrics-log', action='store_true', help='вывести сводку метрик загрузки и запросов в лог')
+    parser.add_argument('--metrics-json', metavar='PATH', help='сохранить метрики в JSON-файл')
+    parser.add_argument('--metrics-prom', metavar='PATH',
+                        help='сохранить метрики в текстовом формате Prometheus (textfile collector)')
+    parser.add_argument('--explain', action='store_true',
+                        help='сохранять в метриках планы EXPLAIN (ANALYZE, BUFFERS) запросов PostgreSQL')
+    args = parser.parse_args()
+    if args.explain and not (args.metrics_log or args.metrics_json or args.metrics_prom):
+        parser.error('--explain требует --metrics-log, --metrics-json или --metrics-prom')
+    reports = None
+    if args.batch:
+        try:
+            reports = parse_reports(args.batch)
+        except ValueError as error:
+            parser.error(str(error))
+    metrics_enabled = enable_metrics(args.metrics_json, args.metrics_prom, args.metrics_log, args.explain)
+
+    try:
+        if args.batch:
+            export_reports(reports, args.format, args.output_dir, args.storage)
+        elif args.diff_snapshots:
+            diff_snapshots(*args.diff_snapshots)
+        else:
+            main(args.rebuild, args.storage, args.snapshot, args.parse_workers, args.cache, args.offline)
+    finally:
+        if metrics_enabled:
+            metrics.flush()
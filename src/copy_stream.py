@@ -0,0 +1,43 @@
+import io
+from typing import Iterable
+
+
+class CopyStream(io.TextIOBase):
+    """Файлоподобный объект для COPY ... FROM STDIN в текстовом формате PostgreSQL.
+    Строки формируются из генератора кортежей по мере чтения, без построения списка в памяти"""
+
+    _ESCAPES = str.maketrans({'\\': '\\\\', '\t': '\\t', '\n': '\\n', '\r': '\\r'})
+
+    def __init__(self, rows: Iterable[tuple]):
+        self._lines = (self.format_row(row) for row in rows)
+        self._buffer = ''
+        self.rows_count = 0
+
+    @classmethod
+    def format_value(cls, value) -> str:
+        if value is None:
+            return '\\N'
+        return str(value).translate(cls._ESCAPES)
+
+    @classmethod
+    def format_row(cls, row: tuple) -> str:
+        return '\t'.join(cls.format_value(value) for value in row) + '\n'
+
+    def readable(self) -> bool:
+        return True
+
+    def read(self, size: int = -1) -> str:
+        parts = [self._buffer]
+        length = len(self._buffer)
+        while size < 0 or length < size:
+            line = next(self._lines, None)
+            if line is None:
+                break
+            parts.append(line)
+            length += len(line)
+            self.rows_count += 1
+        data = ''.join(parts)
+        if size < 0:
+            size = length
+        self._buffer = data[size:]
+        return data[:size]
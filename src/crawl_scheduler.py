@@ -0,0 +1,176 @@
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterator
+from datetime import datetime, timedelta
+
+
+class TokenBucket:
+    """Ограничитель частоты запросов по алгоритму token bucket. Потокобезопасен"""
+
+    def __init__(self, rate: float, capacity: int = None):
+        self.rate = rate
+        self.capacity = capacity or max(1, int(rate))
+        self._tokens = float(self.capacity)
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        """Забирает один токен, при необходимости ожидая его появления"""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+                self._last = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+class CrawlScheduler:
+    """Разбивает загрузку вакансий на подзапросы так, чтобы каждый укладывался в ограничение HH
+    на глубину выдачи (page * per_page <= 2000): сначала по работодателям, затем по окнам даты публикации"""
+
+    def __init__(self, api, max_workers: int = None, period_days: int = 30,
+                 min_window: timedelta = timedelta(hours=1)):
+        self.api = api
+        self.max_workers = max_workers or api.max_workers
+        self.period_days = period_days
+        self.min_window = min_window
+        # сумма found по запросам работодателей последнего плана - сколько вакансий ожидается загрузить
+        self.expected_count = 0
+
+    @staticmethod
+    def _to_iso(moment: datetime) -> str:
+        return moment.replace(microsecond=0).isoformat()
+
+    def _split(self, params: dict, date_from: datetime, date_to: datetime) -> list[tuple]:
+        """Рекурсивно делит окно дат пополам, пока выдача не уложится в ограничение глубины.
+        Возвращает список пар (параметры подзапроса, первая страница ответа)"""
+        first_page = self.api.get_page(params, 0)
+        if first_page.get('found', 0) <= self.api.MAX_DEPTH:
+            return [(params, first_page)]
+        if date_to - date_from <= self.min_window:
+            print(f"Внимание: подзапрос {params} превышает лимит {self.api.MAX_DEPTH} вакансий, "
+                  f"часть вакансий не будет загружена")
+            return [(params, first_page)]
+
+        middle = date_from + (date_to - date_from) / 2
+        return (self._split({**params, 'date_from': self._to_iso(date_from), 'date_to': self._to_iso(middle)},
+                            date_from, middle)
+                + self._split({**params, 'date_from': self._to_iso(middle), 'date_to': self._to_iso(date_to)},
+                              middle, date_to))
+
+    def _split_older(self, params: dict, before: datetime) -> list[tuple]:
+        """Подзапросы для вакансий, опубликованных раньше before: открытое снизу окно, а если оно не укладывается
+        в ограничение глубины - окно в period_days дней перед before (делится _split) и рекурсивно более ранние"""
+        older_params = {**params, 'date_to': self._to_iso(before)}
+        first_page = self.api.get_page(older_params, 0)
+        if not first_page.get('found', 0):
+            return []
+        if first_page['found'] <= self.api.MAX_DEPTH:
+            return [(older_params, first_page)]
+
+        window_start = before - timedelta(days=self.period_days)
+        return (self._split({**params, 'date_from': self._to_iso(window_start), 'date_to': self._to_iso(before)},
+                            window_start, before)
+                + self._split_older(params, window_start))
+
+    def plan(self, params: dict) -> list[tuple]:
+        """Формирует список подзапросов по работодателям, при необходимости разбитых по датам (см. _make_plan).
+        При заданном кэше ответов план сохраняется в нем и повторяется в автономном режиме"""
+        cache = getattr(self.api, 'cache', None)
+        if cache is None:
+            return self._make_plan(params)
+
+        plan_key = cache.make_key(f"{self.api.url}#plan", params)
+        if cache.offline:
+            entry = cache.get(plan_key)
+            if entry is None:
+                raise LookupError(f"План загрузки {params} отсутствует в кэше, а загрузка из сети отключена")
+            self.expected_count = entry['body']['expected_count']
+            return [(slice_params, self.api.get_page(slice_params, 0)) for slice_params in entry['body']['slices']]
+
+        slices = self._make_plan(params)
+        cache.put(plan_key, {'expected_count': self.expected_count,
+                             'slices': [slice_params for slice_params, _ in slices]})
+        return slices
+
+    def _make_plan(self, params: dict) -> list[tuple]:
+        employer_ids = params.get('employer_id')
+        if isinstance(employer_ids, (str, int)) or employer_ids is None:
+            employer_ids = [employer_ids]
+        base_params = {k: v for k, v in params.items() if k != 'employer_id'}
+
+        # граница окна округляется вверх до часа, чтобы ключи подзапросов повторялись между запусками
+        date_to = (datetime.fromisoformat(params['date_to']) if params.get('date_to')
+                   else datetime.now().replace(minute=0, second=0, microsecond=0) + timedelta(hours=1))
+        date_from = (datetime.fromisoformat(params['date_from']) if params.get('date_from')
+                     else date_to - timedelta(days=self.period_days))
+
+        def split_employer(employer_id):
+            slice_params = dict(base_params) if employer_id is None else {**base_params, 'employer_id': employer_id}
+            first_page = self.api.get_page(slice_params, 0)
+            found = first_page.get('found', 0)
+            if found <= self.api.MAX_DEPTH:
+                return found, [(slice_params, first_page)]
+            slices = self._split({**slice_params, 'date_from': self._to_iso(date_from),
+                                  'date_to': self._to_iso(date_to)}, date_from, date_to)
+            if not params.get('date_from'):
+                slices += self._split_older(slice_params, date_from)
+            return found, slices
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            employers_slices = list(executor.map(split_employer, employer_ids))
+        self.expected_count = sum(found for found, _ in employers_slices)
+        return [item for _, slices in employers_slices for item in slices]
+
+    def check_shortfall(self, loaded_count: int) -> None:
+        """Предупреждает, если загружено меньше вакансий, чем найдено по запросам работодателей"""
+        if loaded_count < self.expected_count:
+            print(f"Внимание: загружено {loaded_count} из {self.expected_count} найденных вакансий")
+
+    def iter_pages(self, params: dict, raw: bool = False) -> Iterator:
+        """Генератор вакансий постранично по плану подзапросов, страницы загружаются в пуле потоков.
+        При raw=True отдаются пары (параметры запроса страницы, страница без разбора)"""
+        slices = self.plan(params)
+        print(f"Запрос разбит на {len(slices)} подзапросов")
+
+        seen_ids = set()
+
+        def unseen_items(page: dict) -> list[dict]:
+            items = [item for item in page['items'] if item['id'] not in seen_ids]
+            seen_ids.update(item['id'] for item in items)
+            return items
+
+        get_page = self.api.get_page_raw if raw else self.api.get_page
+        tasks = iter([(slice_params, page_num)
+                      for slice_params, first_page in slices
+                      for page_num in range(1, self.api.get_pages_count(first_page, slice_params))])
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            in_flight = deque((task, executor.submit(get_page, *task))
+                              for _, task in zip(range(self.max_workers * 2), tasks))
+
+            for slice_params, first_page in slices:
+                yield ({**slice_params, 'page': 0}, first_page) if raw else unseen_items(first_page)
+
+            pages_read = 0
+            while in_flight:
+                (slice_params, page_num), future = in_flight.popleft()
+                page = future.result()
+                next_task = next(tasks, None)
+                if next_task is not None:
+                    in_flight.append((next_task, executor.submit(get_page, *next_task)))
+                pages_read += 1
+                print(f"Чтение страницы hh №{pages_read}")
+                yield ({**slice_params, 'page': page_num}, page) if raw else unseen_items(page)
+
+        if not raw:
+            self.check_shortfall(len(seen_ids))
+
+    def crawl(self, params: dict) -> list[dict]:
+        """Загружает все вакансии по плану подзапросов"""
+        return [item for items in self.iter_pages(params) for item in items]
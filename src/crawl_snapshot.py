@@ -0,0 +1,199 @@
+import json
+import os
+import shutil
+import struct
+import time
+import zlib
+import numpy as np
+from typing import Iterable, Optional
+from src.vacancy_frame import StringTable, VacancyFrame
+
+
+class SnapshotWriter:
+    """Потоковая запись снимка порциями строк в формате VacancyFrame.from_rows.
+    В контекстном менеджере снимок сохраняется (commit) при успешном выходе и удаляется (abort) при исключении"""
+
+    # размер заголовка .npy, в который помещается любая длина колонки (кратен выравниванию формата)
+    HEADER_SIZE = 128
+
+    def __init__(self, store: 'SnapshotStore', params: dict = None):
+        self.store = store
+        self.params = params or {}
+        self.name = store.new_name()
+        self.count = 0
+        self._tmp_path = store._path(f".{self.name}.tmp")
+        os.makedirs(self._tmp_path)
+        self._name_codes = {}
+        self._employer_names = {}
+        self._columns = {column: open(os.path.join(self._tmp_path, f"{column}.npy"), 'wb')
+                         for column in store.ARRAY_COLUMNS}
+        for column, file in self._columns.items():
+            file.write(self._npy_header(store.COLUMN_DTYPES[column], 0))
+        self._urls_file = open(os.path.join(self._tmp_path, store.URLS_FILE), 'wb')
+        self._urls_compressor = zlib.compressobj(store.compress_level)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, *exc):
+        if exc_type is None:
+            self.commit()
+        else:
+            self.abort()
+
+    def _npy_header(self, dtype: str, length: int) -> bytes:
+        header = repr({'descr': np.dtype(dtype).str, 'fortran_order': False, 'shape': (length,)})
+        prefix = np.lib.format.magic(1, 0)
+        header_len = self.HEADER_SIZE - len(prefix) - 2
+        return prefix + struct.pack('<H', header_len) + (header.ljust(header_len - 1) + '\n').encode('latin1')
+
+    def append(self, rows: Iterable[tuple]) -> None:
+        """Дописывает в снимок порцию строк"""
+        rows = list(rows)
+        if not rows:
+            return
+        name_codes = self._name_codes
+        for row in rows:
+            self._employer_names.setdefault(row[1], row[2])
+        arrays = {'ids': [row[0] for row in rows],
+                  'employer_ids': [row[1] for row in rows],
+                  'salary_from': [row[4] or 0 for row in rows],
+                  'salary_to': [row[5] or 0 for row in rows],
+                  'name_codes': [name_codes.setdefault(row[3], len(name_codes)) for row in rows],
+                  # url у вакансий уникальны, код url - номер строки снимка
+                  'url_codes': range(self.count, self.count + len(rows))}
+        for column, values in arrays.items():
+            self._columns[column].write(np.asarray(values, dtype=self.store.COLUMN_DTYPES[column]).tobytes())
+        self._urls_file.write(self._urls_compressor.compress(
+            ''.join(json.dumps(row[6], ensure_ascii=False) + '\n' for row in rows).encode('utf-8')))
+        self.count += len(rows)
+
+    def _close_files(self) -> None:
+        for file in self._columns.values():
+            file.close()
+        self._urls_file.close()
+
+    def commit(self) -> str:
+        """Завершает запись и переносит снимок в архив. Возвращает имя снимка"""
+        try:
+            for column, file in self._columns.items():
+                file.seek(0)
+                file.write(self._npy_header(self.store.COLUMN_DTYPES[column], self.count))
+            self._urls_file.write(self._urls_compressor.flush())
+            self._close_files()
+
+            strings = {'names': list(self._name_codes), 'employers': list(self._employer_names.items())}
+            with open(os.path.join(self._tmp_path, self.store.STRINGS_FILE), 'wb') as file:
+                file.write(zlib.compress(json.dumps(strings, ensure_ascii=False).encode('utf-8'),
+                                         self.store.compress_level))
+            meta = {'format_version': self.store.FORMAT_VERSION, 'name': self.name, 'created_at': time.time(),
+                    'vacancies_count': self.count, 'params': self.params}
+            with open(os.path.join(self._tmp_path, self.store.META_FILE), 'w', encoding='utf-8') as file:
+                json.dump(meta, file, ensure_ascii=False, default=str)
+            os.rename(self._tmp_path, self.store._path(self.name))
+        except BaseException:
+            self.abort()
+            raise
+        return self.name
+
+    def abort(self) -> None:
+        """Прерывает запись и удаляет незавершенный снимок"""
+        self._close_files()
+        shutil.rmtree(self._tmp_path, ignore_errors=True)
+
+
+class SnapshotStore:
+    """Архив снимков загрузок вакансий в колоночном формате. Каждый снимок - каталог с именем-версией
+    (время загрузки), в котором числовые колонки и коды строк хранятся в файлах .npy и читаются
+    через отображение в память без разбора JSON, а таблицы строк (названия, url, работодатели)
+    сжаты zlib. Снимки загружаются как VacancyFrame для аналитики, сравнения загрузок или заполнения БД"""
+
+    # версия 2 хранит url отдельным потоково сжатым файлом, снимки версии 1 по-прежнему читаются
+    FORMAT_VERSION = 2
+    READABLE_VERSIONS = (1, 2)
+    # колонки VacancyFrame, сохраняемые в .npy
+    ARRAY_COLUMNS = ('ids', 'employer_ids', 'salary_from', 'salary_to', 'name_codes', 'url_codes')
+    COLUMN_DTYPES = {'ids': '<i8', 'employer_ids': '<i8', 'salary_from': '<i8', 'salary_to': '<i8',
+                     'name_codes': '<i4', 'url_codes': '<i4'}
+    STRINGS_FILE = 'strings.json.zlib'
+    URLS_FILE = 'urls.jsonl.zlib'
+    META_FILE = 'meta.json'
+
+    def __init__(self, snapshots_dir: str, compress_level: int = 6):
+        self.snapshots_dir = snapshots_dir
+        self.compress_level = compress_level
+        os.makedirs(snapshots_dir, exist_ok=True)
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.snapshots_dir, name)
+
+    def new_name(self) -> str:
+        """Имя нового снимка по текущему времени, не занятое готовым или записываемым снимком"""
+        name = time.strftime('%Y%m%dT%H%M%S')
+        suffix = 1
+        while os.path.exists(self._path(name)) or os.path.exists(self._path(f".{name}.tmp")):
+            name = f"{time.strftime('%Y%m%dT%H%M%S')}_{suffix}"
+            suffix += 1
+        return name
+
+    def writer(self, params: dict = None) -> SnapshotWriter:
+        """Потоковая запись нового снимка, см. SnapshotWriter.
+        params - параметры загрузки, записываются в метаданные снимка"""
+        return SnapshotWriter(self, params)
+
+    def save(self, frame: VacancyFrame, params: dict = None) -> str:
+        """Сохраняет набор вакансий frame как новый снимок и возвращает его имя.
+        params - параметры загрузки, записываются в метаданные снимка"""
+        with self.writer(params) as writer:
+            for rows in frame.iter_rows():
+                writer.append(rows)
+        return writer.name
+
+    def names(self) -> list[str]:
+        """Имена снимков архива от старых к новым"""
+        return sorted(entry.name for entry in os.scandir(self.snapshots_dir)
+                      if entry.is_dir() and not entry.name.startswith('.'))
+
+    def latest(self) -> Optional[str]:
+        names = self.names()
+        return names[-1] if names else None
+
+    def meta(self, name: str) -> dict:
+        with open(os.path.join(self._path(name), self.META_FILE), encoding='utf-8') as file:
+            return json.load(file)
+
+    def load(self, name: str, mmap: bool = True) -> VacancyFrame:
+        """Загружает снимок name как VacancyFrame. При mmap=True колонки отображаются в память
+        и читаются с диска по мере обращения, иначе читаются целиком"""
+        path = self._path(name)
+        meta = self.meta(name)
+        if meta['format_version'] not in self.READABLE_VERSIONS:
+            raise ValueError(f"Снимок {name} имеет неподдерживаемую версию формата {meta['format_version']}")
+
+        columns = {column: np.load(os.path.join(path, f"{column}.npy"), mmap_mode='r' if mmap else None)
+                   for column in self.ARRAY_COLUMNS}
+        with open(os.path.join(path, self.STRINGS_FILE), 'rb') as file:
+            strings = json.loads(zlib.decompress(file.read()).decode('utf-8'))
+        if meta['format_version'] >= 2:
+            with open(os.path.join(path, self.URLS_FILE), 'rb') as file:
+                strings['urls'] = [json.loads(line) for line in zlib.decompress(file.read()).decode('utf-8')
+                                   .splitlines()]
+        return VacancyFrame(columns['ids'], columns['employer_ids'], columns['salary_from'], columns['salary_to'],
+                            StringTable(columns['name_codes'], strings['names']),
+                            StringTable(columns['url_codes'], strings['urls']),
+                            {employer_id: employer_name for employer_id, employer_name in strings['employers']})
+
+    def diff(self, old_name: str, new_name: str) -> dict:
+        """Изменения между снимками old_name и new_name, см. VacancyFrame.diff"""
+        return self.load(new_name).diff(self.load(old_name))
+
+    def remove(self, name: str) -> None:
+        shutil.rmtree(self._path(name))
+
+    def prune(self, keep: int) -> list[str]:
+        """Удаляет старые снимки, оставляя keep последних. Возвращает имена удаленных снимков"""
+        names = self.names()
+        removed = names[:-keep] if keep > 0 else names
+        for name in removed:
+            self.remove(name)
+        return removed
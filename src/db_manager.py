@@ -1,39 +1,162 @@
+import threading
+import time
+import uuid
 import psycopg2
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from psycopg2.extras import execute_batch
+from psycopg2.pool import PoolError, ThreadedConnectionPool
+from typing import Iterable, Iterator
+from src.copy_stream import CopyStream
+from src.metrics import metrics
+from src.query_cache import QueryCache, cached_report
+from src.storage_backend import StorageBackend
 from src.vacancy import Vacancy
 
 
-class DbManager:
-    """Управляет подключением к БД. Осуществляет выборку данных из sql БД по фильтрам"""
+def _capture_explain(conn, query: str, query_params=None) -> None:
+    """Сохраняет в метрики план EXPLAIN (ANALYZE, BUFFERS) запроса на чтение, выполнив его на обычном курсоре"""
+    if not query.lstrip().upper().startswith(('SELECT', 'WITH')):
+        return
+    with conn.cursor() as cur:
+        cur.execute(f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {query}", query_params)
+        metrics.record_explain(query, cur.fetchone()[0])
+
+
+class _InstrumentedCursor(psycopg2.extensions.cursor):
+    """Курсор, записывающий задержку запросов в метрики и, в режиме explain,
+    план EXPLAIN (ANALYZE, BUFFERS) запросов на чтение"""
+
+    label = ''
 
-    query_cases_dict = {"1": "Список всех компаний и количество вакансий у каждой компании",
-                        "2": "Список всех вакансий с указанием названия компании,названия вакансии"
-                             " и зарплаты и ссылки на вакансию",
-                        "3": "Cредняя зарплата по вакансиям",
-                        "4": "Список всех вакансий, у которых зарплата выше средней по всем вакансиям",
-                        "5": "Список всех вакансий, в названии которых содержатся переданные в метод слова,"
-                             " например python",
-                        "0": "Выход"}
+    def execute(self, query, query_params=None):
+        if metrics.explain:
+            _capture_explain(self.connection, query, query_params)
+        start = time.perf_counter()
+        result = super().execute(query, query_params)
+        metrics.observe('db_query_seconds', time.perf_counter() - start, self.label)
+        return result
+
+
+class DbManager(StorageBackend):
+    """Управляет подключением к БД. Осуществляет выборку данных из sql БД по фильтрам"""
 
-    def __init__(self, db_name, params):
+    # хэш содержимого строки вакансии, по которому синхронизация пропускает неизмененные строки.
+    # JSON-массив сохраняет позиции NULL: (NULL, 100000) и (100000, NULL) дают разные хэши
+    vacancy_hash_sql = "md5(json_build_array(employer_id, vacancy_name, salary_from, salary_to, url)::text)"
+    # вакансии с зарплатой выше средней: среднее вычисляется один раз в CTE, а не подзапросом на каждое условие
+    higher_salary_sql = """
+    WITH salary_avg AS (SELECT AVG(salary_from) AS avg
+                        FROM vacancies
+                        WHERE salary_from IS NOT NULL AND is_active)
+    SELECT vacancy_name, salary_from, salary_to
+    FROM vacancies, salary_avg
+    WHERE is_active AND (salary_from > salary_avg.avg OR salary_to > salary_avg.avg)
+    ORDER BY salary_from, salary_to
+    """
+
+
+    def __init__(self, db_name, params, pool_size: int = None, pool_timeout: float = None,
+                 query_cache: QueryCache = None):
         self.db_name = db_name
         self.params = params
+        # кэш результатов отчетов, сбрасывается при каждой загрузке или синхронизации данных
+        self.query_cache = query_cache
         self._connection = None
-
-    def __enter__(self):
-        self.create_connection()
-        return self
-
-    def __exit__(self, *exc):
-        self.close_connection()
+        # пул соединений для параллельного выполнения отчетов, включается заданием pool_size
+        self.pool_size = pool_size
+        self.pool_timeout = pool_timeout
+        self._pool = None
+        self._pool_slots = None
+        self._in_snapshot = False
+        self._pool_stats_lock = threading.Lock()
+        self._pool_stats = {'checkouts': 0, 'in_use': 0, 'wait_time_total': 0.0, 'wait_time_max': 0.0}
 
     def create_connection(self) -> None:
         if not self._connection:
             self._connection = psycopg2.connect(**self.params)
+        if self.pool_size and not self._pool:
+            self._pool = ThreadedConnectionPool(1, self.pool_size, **self.params)
+            self._pool_slots = threading.BoundedSemaphore(self.pool_size)
 
     def close_connection(self) -> None:
         if self._connection:
             self._connection.close()
+        if self._pool:
+            self._pool.closeall()
+            self._pool = None
+
+    @contextmanager
+    def connection(self):
+        """Выдает соединение для выполнения запросов. В режиме пула соединение берется из пула
+        (с ожиданием свободного не дольше pool_timeout) и возвращается в него после использования.
+        Соединения пула видят только зафиксированные данные. Внутри snapshot() используется
+        основное соединение, чтобы все запросы читали один снимок данных"""
+        if not self._pool or self._in_snapshot:
+            yield self._connection
+            return
+
+        wait_start = time.perf_counter()
+        if not self._pool_slots.acquire(timeout=self.pool_timeout):
+            raise PoolError(f"Нет свободных соединений в пуле за {self.pool_timeout} с")
+        wait_time = time.perf_counter() - wait_start
+        with self._pool_stats_lock:
+            self._pool_stats['checkouts'] += 1
+            self._pool_stats['in_use'] += 1
+            self._pool_stats['wait_time_total'] += wait_time
+            self._pool_stats['wait_time_max'] = max(self._pool_stats['wait_time_max'], wait_time)
+
+        conn = self._pool.getconn()
+        try:
+            yield conn
+        finally:
+            conn.rollback()
+            self._pool.putconn(conn)
+            with self._pool_stats_lock:
+                self._pool_stats['in_use'] -= 1
+            self._pool_slots.release()
+
+    @contextmanager
+    def snapshot(self):
+        """Транзакция только для чтения с уровнем изоляции REPEATABLE READ: все отчеты внутри
+        читают один согласованный снимок данных. Незафиксированные изменения предварительно фиксируются"""
+        self._connection.commit()
+        self._connection.set_session(isolation_level='REPEATABLE READ', readonly=True)
+        self._in_snapshot = True
+        try:
+            yield self
+        finally:
+            self._in_snapshot = False
+            self._connection.rollback()
+            self._connection.set_session(isolation_level='DEFAULT', readonly='DEFAULT')
+
+    @contextmanager
+    def cursor(self, label: str = ''):
+        """Курсор на соединении, выданном connection(). При включенных метриках задержка запросов
+        записывается в гистограмму с меткой label"""
+        with self.connection() as conn:
+            if not metrics.enabled:
+                with conn.cursor() as cur:
+                    yield cur
+                return
+            with conn.cursor(cursor_factory=_InstrumentedCursor) as cur:
+                cur.label = label
+                yield cur
+
+    def pool_stats(self) -> dict:
+        """Состояние пула: размер, занятые соединения, число выдач и время ожидания свободного соединения"""
+        with self._pool_stats_lock:
+            return {'size': self.pool_size or 0, **self._pool_stats}
+
+    def run_reports(self, reports: dict) -> dict:
+        """Параллельно выполняет несколько отчетов и собирает результаты.
+        reports - словарь {ключ результата: (имя метода отчета, dict именованных аргументов)}"""
+        def run(report):
+            method_name, kwargs = report
+            return getattr(self, method_name)(**kwargs)
+
+        with ThreadPoolExecutor(max_workers=self.pool_size or 1) as executor:
+            return dict(zip(reports, executor.map(run, reports.values())))
 
     def create_db(self) -> None:
         self.execute_sql_query(f"CREATE DATABASE {self.db_name}")
@@ -41,6 +164,31 @@ class DbManager:
     def drop_db(self) -> None:
         self.execute_sql_query(f"DROP DATABASE {self.db_name}")
 
+    def create_db_if_not_exists(self) -> None:
+        with self._connection.cursor() as cur:
+            cur.execute("SELECT 1 FROM pg_database WHERE datname = %s", (self.db_name,))
+            exists = cur.fetchone() is not None
+        # CREATE DATABASE выполняется в режиме autocommit, который нельзя включить внутри открытой транзакции
+        self._connection.rollback()
+        if not exists:
+            self.create_db()
+
+    def prepare_storage(self, rebuild: bool = False) -> None:
+        """Создает таблицы в БД текущего соединения; при rebuild=True предварительно удаляет их,
+        как SqliteDbManager.prepare_storage"""
+        self.create_db_if_not_exists()
+        if rebuild:
+            with self._connection.cursor() as cur:
+                cur.execute("DROP TABLE IF EXISTS vacancies, employers")
+
+        self.creat_employers_table(if_not_exists=True)
+        print(f"Создана таблица employers")
+
+        self.create_vacancies_table(if_not_exists=True)
+        print(f"Создана таблица vacancies")
+        self._connection.commit()
+        self.bump_data_version()
+
     def execute_sql_query(self, query: str, is_autocommit: bool = True) -> None:
         """Выполняет запрос query к БД"""
         try:
@@ -55,28 +203,52 @@ class DbManager:
             if self._connection:
                 self._connection.autocommit = False
 
-    def create_vacancies_table(self) -> None:
+    def create_vacancies_table(self, if_not_exists: bool = False) -> None:
         """Создает таблицу vacancies."""
         with self._connection.cursor() as cur:
-            cur.execute("""
-            CREATE TABLE vacancies (
+            cur.execute(f"""
+            CREATE TABLE {'IF NOT EXISTS ' if if_not_exists else ''}vacancies (
                 vacancy_id INT PRIMARY KEY,
                 employer_id INT,
                 vacancy_name VARCHAR(255) NOT NULL,
                 salary_from INT,
                 salary_to INT,
                 url VARCHAR(255) NOT NULL,
+                content_hash CHAR(32),
+                is_active BOOLEAN NOT NULL DEFAULT TRUE,
                 CONSTRAINT fk_employer
                             FOREIGN KEY(employer_id) 
                             REFERENCES employers(employer_id)
         )
         """)
+        self.create_vacancies_indexes()
 
-    def creat_employers_table(self) -> None:
-        """Создает таблицу employers."""
+    def create_vacancies_indexes(self) -> None:
+        """Создает индексы таблицы vacancies: триграммный GIN-индекс для поиска по названию вакансии
+        и B-tree индексы по зарплате и работодателю для аналитических отчетов"""
         with self._connection.cursor() as cur:
+            cur.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
             cur.execute("""
-            CREATE TABLE employers (
+            CREATE INDEX IF NOT EXISTS idx_vacancies_name_trgm
+            ON vacancies USING GIN (vacancy_name gin_trgm_ops)
+            """)
+            cur.execute("CREATE INDEX IF NOT EXISTS idx_vacancies_salary_from ON vacancies (salary_from)")
+            cur.execute("CREATE INDEX IF NOT EXISTS idx_vacancies_salary_to ON vacancies (salary_to)")
+            cur.execute("CREATE INDEX IF NOT EXISTS idx_vacancies_employer_id ON vacancies (employer_id)")
+            # keyset-пагинация get_vacancies_page: работодатели читаются по индексу от ключа страницы,
+            # сортируются только вакансии просматриваемых работодателей, а не вся выборка
+            cur.execute("CREATE INDEX IF NOT EXISTS idx_employers_name ON employers (employer_name)")
+            cur.execute(f"""
+            CREATE INDEX IF NOT EXISTS idx_vacancies_page_key
+            ON vacancies (employer_id, COALESCE(salary_from, {self.NULL_SALARY_KEY}), vacancy_id)
+            WHERE is_active
+            """)
+
+    def creat_employers_table(self, if_not_exists: bool = False) -> None:
+        """Создает таблицу employers."""
+        with self._connection.cursor() as cur:
+            cur.execute(f"""
+            CREATE TABLE {'IF NOT EXISTS ' if if_not_exists else ''}employers (
                 employer_id INT PRIMARY KEY,
                 employer_name VARCHAR(255) NOT NULL
             )
@@ -86,15 +258,127 @@ class DbManager:
         """Заполняет таблицы БД и связываем внешние ключи"""
         vacancies_dicts = [vacancy.to_sql_dict() for vacancy in vacancies]
         employers_dicts = []
-        seen_employer_ids = []
+        seen_employer_ids = set()
         for vacancy in vacancies:
             if vacancy.employer.id not in seen_employer_ids:
                 employers_dicts.append(vacancy.employer.to_sql_dict())
-                seen_employer_ids.append(vacancy.employer.id)
+                seen_employer_ids.add(vacancy.employer.id)
 
         # Заполняем sql таблицы из json
-        self.insert_employers_data(employers_dicts)
-        self.insert_vacancies_data(vacancies_dicts)
+        with metrics.stage('db_insert') as stage:
+            self.insert_employers_data(employers_dicts)
+            self.insert_vacancies_data(vacancies_dicts)
+            stage.add(items=len(vacancies_dicts))
+
+    @staticmethod
+    def _copy_to_staging(cur, rows: Iterable[tuple]) -> int:
+        """Загружает строки вакансий (см. StorageBackend.load_rows) через COPY ... FROM STDIN во временную
+        таблицу vacancies_staging. rows может быть генератором - строки передаются по мере чтения.
+        Возвращает число строк"""
+        stream = CopyStream(row[:7] for row in rows)
+        cur.execute("""
+        CREATE TEMP TABLE IF NOT EXISTS vacancies_staging (
+            vacancy_id INT,
+            employer_id INT,
+            employer_name VARCHAR(255),
+            vacancy_name VARCHAR(255),
+            salary_from INT,
+            salary_to INT,
+            url VARCHAR(255)
+        )
+        """)
+        cur.execute("TRUNCATE vacancies_staging")
+        cur.copy_expert("""COPY vacancies_staging
+                        (vacancy_id, employer_id, employer_name, vacancy_name, salary_from, salary_to, url)
+                        FROM STDIN""", stream)
+        return stream.rows_count
+
+    def load_rows(self, rows: Iterable[tuple]) -> int:
+        """Массовая загрузка вакансий через COPY во временную таблицу с последующим слиянием
+        в employers и vacancies, чтобы ограничения целевых таблиц продолжали проверяться.
+        Загрузка фиксируется одной транзакцией. Возвращает число загруженных строк"""
+        try:
+            with metrics.stage('db_copy_load') as stage, self._connection.cursor() as cur:
+                rows_count = self._copy_to_staging(cur, rows)
+                stage.add(items=rows_count)
+                cur.execute("""
+                INSERT INTO employers (employer_id, employer_name)
+                SELECT DISTINCT ON (employer_id) employer_id, employer_name
+                FROM vacancies_staging
+                ON CONFLICT (employer_id) DO NOTHING
+                """)
+                cur.execute(f"""
+                INSERT INTO vacancies (vacancy_id, employer_id, vacancy_name, salary_from, salary_to, url, content_hash)
+                SELECT DISTINCT ON (vacancy_id) vacancy_id, employer_id, vacancy_name, salary_from, salary_to, url,
+                       {self.vacancy_hash_sql}
+                FROM vacancies_staging
+                ON CONFLICT (vacancy_id) DO NOTHING
+                """)
+                cur.execute("DROP TABLE vacancies_staging")
+            self._connection.commit()
+        except (Exception, psycopg2.DatabaseError):
+            self._connection.rollback()
+            raise
+        self.bump_data_version()
+        return rows_count
+
+    def sync_rows(self, rows: Iterable[tuple], delete_missing: bool = False) -> dict:
+        """Инкрементальная синхронизация таблиц с текущей выдачей вместо пересоздания БД.
+        Работодатели и вакансии добавляются или обновляются через ON CONFLICT, вакансии с неизменным
+        хэшем содержимого не перезаписываются. Вакансии, отсутствующие в выдаче, помечаются
+        неактивными (или удаляются при delete_missing). Все изменения фиксируются одной транзакцией,
+        поэтому читатели видят согласованные данные на протяжении синхронизации"""
+        try:
+            with metrics.stage('db_sync') as stage, self._connection.cursor() as cur:
+                loaded = self._copy_to_staging(cur, rows)
+                stage.add(items=loaded)
+                cur.execute("""
+                INSERT INTO employers (employer_id, employer_name)
+                SELECT DISTINCT ON (employer_id) employer_id, employer_name
+                FROM vacancies_staging
+                ON CONFLICT (employer_id) DO UPDATE
+                SET employer_name = EXCLUDED.employer_name
+                WHERE employers.employer_name IS DISTINCT FROM EXCLUDED.employer_name
+                """)
+                employers_changed = cur.rowcount
+
+                cur.execute(f"""
+                INSERT INTO vacancies
+                    (vacancy_id, employer_id, vacancy_name, salary_from, salary_to, url, content_hash, is_active)
+                SELECT DISTINCT ON (vacancy_id) vacancy_id, employer_id, vacancy_name, salary_from, salary_to, url,
+                       {self.vacancy_hash_sql}, TRUE
+                FROM vacancies_staging
+                ON CONFLICT (vacancy_id) DO UPDATE
+                SET employer_id = EXCLUDED.employer_id,
+                    vacancy_name = EXCLUDED.vacancy_name,
+                    salary_from = EXCLUDED.salary_from,
+                    salary_to = EXCLUDED.salary_to,
+                    url = EXCLUDED.url,
+                    content_hash = EXCLUDED.content_hash,
+                    is_active = TRUE
+                WHERE vacancies.content_hash IS DISTINCT FROM EXCLUDED.content_hash
+                   OR NOT vacancies.is_active
+                """)
+                vacancies_changed = cur.rowcount
+
+                missing_condition = """NOT EXISTS (SELECT 1 FROM vacancies_staging s
+                                                   WHERE s.vacancy_id = vacancies.vacancy_id)"""
+                if delete_missing:
+                    cur.execute(f"DELETE FROM vacancies WHERE {missing_condition}")
+                else:
+                    cur.execute(f"UPDATE vacancies SET is_active = FALSE WHERE is_active AND {missing_condition}")
+                vacancies_removed = cur.rowcount
+                cur.execute("DROP TABLE vacancies_staging")
+            self._connection.commit()
+        except (Exception, psycopg2.DatabaseError):
+            self._connection.rollback()
+            raise
+        self.bump_data_version()
+
+        return {'loaded': loaded,
+                'employers_changed': employers_changed,
+                'vacancies_changed': vacancies_changed,
+                'vacancies_removed': vacancies_removed}
 
     def insert_vacancies_data(self, vacancies: list[dict]) -> None:
         """Добавляет данные из vacancies в таблицу vacancies."""
@@ -105,6 +389,7 @@ class DbManager:
                           """)
 
             execute_batch(cur, add_vacancies_query, vacancies)
+        self.bump_data_version()
 
     def insert_employers_data(self, employers: list[dict]) -> None:
         """Добавляет данные из employers в таблицу employers."""
@@ -113,103 +398,216 @@ class DbManager:
                              (employer_id, employer_name) 
                              VALUES (%(employer_id)s, %(employer_name)s)""")
             execute_batch(cur, add_employers_query, employers)
+        self.bump_data_version()
 
+    @cached_report
     def get_employers_and_vacancies_count(self) -> list:
         """Получает список всех компаний и количество вакансий у каждой компании"""
-        with self._connection.cursor() as cur:
+        with self.cursor('get_employers_and_vacancies_count') as cur:
             cur.execute(f"""
-                            SELECT employer_name, COUNT(*)
+                            SELECT employer_name, COUNT(vacancy_id)
                             FROM employers
-                            LEFT JOIN vacancies USING (employer_id)
+                            LEFT JOIN vacancies ON vacancies.employer_id = employers.employer_id
+                                               AND vacancies.is_active
                             GROUP BY employer_name
                             """)
             return cur.fetchall()
 
+    @cached_report
     def get_all_vacancies(self) -> list:
         """Получает список всех вакансий с указанием названия компании,
         названия вакансии и зарплаты и ссылки на вакансию"""
-        with self._connection.cursor() as cur:
+        with self.cursor('get_all_vacancies') as cur:
             cur.execute(f"""
                            SELECT employer_name, vacancy_name, salary_from, salary_to, url 
                            FROM vacancies 
                            JOIN employers USING (employer_id)
+                           WHERE is_active
                            ORDER BY employer_name, salary_from, salary_to
                            """)
             return cur.fetchall()
 
+    def iter_query(self, query: str, query_params=None, itersize: int = 2000, label: str = '') -> Iterator[tuple]:
+        """Выполняет запрос на именованном (серверном) курсоре и отдает строки по мере получения
+        порциями по itersize, не загружая весь результат в память клиента. При включенных метриках
+        в гистограмму с меткой label записывается время выполнения и чтения запроса без времени
+        обработки строк потребителем"""
+        with self.connection() as conn:
+            with conn.cursor(name=f"stream_{uuid.uuid4().hex}") as cur:
+                cur.itersize = itersize
+                if not metrics.enabled:
+                    cur.execute(query, query_params)
+                    yield from cur
+                    return
+
+                if metrics.explain:
+                    _capture_explain(conn, query, query_params)
+                start = time.perf_counter()
+                cur.execute(query, query_params)
+                elapsed = time.perf_counter() - start
+                rows = iter(cur)
+                while True:
+                    start = time.perf_counter()
+                    row = next(rows, None)
+                    elapsed += time.perf_counter() - start
+                    if row is None:
+                        break
+                    yield row
+                metrics.observe('db_query_seconds', elapsed, label)
+
+    def iter_all_vacancies(self, itersize: int = 2000) -> Iterator[tuple]:
+        """Потоковый вариант get_all_vacancies на серверном курсоре"""
+        return self.iter_query("""
+                           SELECT employer_name, vacancy_name, salary_from, salary_to, url
+                           FROM vacancies
+                           JOIN employers USING (employer_id)
+                           WHERE is_active
+                           ORDER BY employer_name, salary_from, salary_to
+                           """, itersize=itersize, label='iter_all_vacancies')
+
+    def iter_vacancies_with_higher_salary(self, itersize: int = 2000) -> Iterator[tuple]:
+        """Потоковый вариант get_vacancies_with_higher_salary на серверном курсоре"""
+        return self.iter_query(self.higher_salary_sql, itersize=itersize,
+                               label='iter_vacancies_with_higher_salary')
+
+    def get_vacancies_page(self, after: tuple = None, limit: int = 20) -> list:
+        """Страница списка всех вакансий с keyset-пагинацией: строки упорядочены по
+        (employer_name, salary_from, vacancy_id), вакансии без зарплаты - в конце работодателя.
+        Следующая страница начинается после ключа after последней строки предыдущей страницы.
+        Строки: (employer_name, vacancy_name, salary_from, salary_to, url, vacancy_id)"""
+        salary_key = f"COALESCE(salary_from, {self.NULL_SALARY_KEY})"
+        condition = (f"AND employer_name >= %s AND (employer_name, {salary_key}, vacancy_id) > (%s, %s, %s)"
+                     if after else "")
+        with self.cursor('get_vacancies_page') as cur:
+            cur.execute(f"""
+                           SELECT employer_name, vacancy_name, salary_from, salary_to, url, vacancy_id
+                           FROM vacancies
+                           JOIN employers USING (employer_id)
+                           WHERE is_active {condition}
+                           ORDER BY employer_name, {salary_key}, vacancy_id
+                           LIMIT %s
+                           """, (*((after[0], *after) if after else ()), limit))
+            return cur.fetchall()
+
+    @cached_report
     def get_avg_salary(self) -> dict:
         """Получает среднюю зарплату по вакансиям"""
-        with self._connection.cursor() as cur:
+        with self.cursor('get_avg_salary') as cur:
             cur.execute(f"""
                          SELECT AVG(salary_from) as salary_from_avg
                          FROM vacancies
-                         WHERE salary_from IS NOT NULL
+                         WHERE salary_from IS NOT NULL AND is_active
                          """)
             avg_salary = cur.fetchone()
             return avg_salary
 
+    @cached_report
     def get_vacancies_with_higher_salary(self) -> list:
         """Получает список всех вакансий, у которых зарплата выше средней по всем вакансиям."""
-        with self._connection.cursor() as cur:
-            cur.execute(f"""
-                           SELECT vacancy_name, salary_from, salary_to
-                           FROM vacancies 
-                           WHERE salary_from > (SELECT AVG(salary_from)
-                                               FROM vacancies
-                                               WHERE salary_from IS NOT NULL) 
-                           or salary_to > (SELECT AVG(salary_from)
-                                           FROM vacancies
-                                           WHERE salary_from IS NOT NULL)
-                           ORDER BY salary_from, salary_to
-                           """)
+        with self.cursor('get_vacancies_with_higher_salary') as cur:
+            cur.execute(self.higher_salary_sql)
             return cur.fetchall()
 
-    def get_vacancies_with_keyword(self, keyword: str) -> list:
-        """Получает список всех вакансий, в названии которых содержатся переданные в метод слова, например python"""
-        with self._connection.cursor() as cur:
-            cur.execute(f"""
-                            SELECT vacancy_name
-                            FROM vacancies 
-                            WHERE LOWER(vacancy_name) LIKE '%{keyword.lower()}%'
-                            ORDER BY salary_from, salary_to
-                            """)
+    @cached_report
+    def get_salary_report(self, buckets_count: int = 10) -> dict:
+        """Аналитика по зарплатам за один проход по таблице vacancies: средняя, медиана и перцентили
+        по всем вакансиям и по каждой компании, гистограмма зарплат из buckets_count интервалов
+        и список вакансий с зарплатой выше средней"""
+        with self.cursor('get_salary_report') as cur:
+            cur.execute("""
+                WITH active AS MATERIALIZED (
+                    SELECT employer_id, vacancy_name, salary_from, salary_to
+                    FROM vacancies
+                    WHERE is_active
+                ),
+                stats AS (
+                    SELECT AVG(salary_from)::float AS avg,
+                           percentile_cont(ARRAY[0.25, 0.5, 0.75, 0.9])
+                               WITHIN GROUP (ORDER BY salary_from) AS percentiles,
+                           MIN(salary_from) AS min,
+                           MAX(salary_from) AS max,
+                           COUNT(salary_from) AS count
+                    FROM active
+                ),
+                by_employer AS (
+                    SELECT employer_name,
+                           AVG(salary_from)::float AS avg,
+                           percentile_cont(0.5) WITHIN GROUP (ORDER BY salary_from) AS median,
+                           COUNT(*) AS count
+                    FROM active
+                    JOIN employers USING (employer_id)
+                    GROUP BY employer_name
+                ),
+                histogram AS (
+                    SELECT width_bucket(salary_from, stats.min, stats.max + 1, %(buckets_count)s) AS bucket,
+                           COUNT(*) AS count
+                    FROM active, stats
+                    WHERE salary_from IS NOT NULL
+                    GROUP BY bucket
+                ),
+                above_avg AS (
+                    SELECT vacancy_name, salary_from, salary_to
+                    FROM active, stats
+                    WHERE salary_from > stats.avg OR salary_to > stats.avg
+                )
+                SELECT (SELECT row_to_json(stats) FROM stats),
+                       (SELECT json_agg(by_employer ORDER BY employer_name) FROM by_employer),
+                       (SELECT json_agg(histogram ORDER BY bucket) FROM histogram),
+                       (SELECT json_agg(json_build_array(vacancy_name, salary_from, salary_to)
+                                        ORDER BY salary_from, salary_to) FROM above_avg)
+                """, {'buckets_count': buckets_count})
+            stats, by_employer, histogram, above_avg = cur.fetchone()
+
+        bucket_width = ((stats['max'] + 1 - stats['min']) / buckets_count) if stats['count'] else 0
+        p25, median, p75, p90 = stats['percentiles'] or [None] * 4
+        return {
+            'avg': stats['avg'],
+            'median': median,
+            'percentiles': {25: p25, 50: median, 75: p75, 90: p90},
+            'count': stats['count'],
+            'by_employer': [(row['employer_name'], row['avg'], row['median'], row['count'])
+                            for row in by_employer or []],
+            'histogram': [(stats['min'] + (row['bucket'] - 1) * bucket_width,
+                           stats['min'] + row['bucket'] * bucket_width,
+                           row['count'])
+                          for row in histogram or []],
+            'above_avg': [tuple(row) for row in above_avg or []],
+        }
+
+    @staticmethod
+    def _escape_like(keyword: str) -> str:
+        return keyword.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
+    def _search_query(self, keywords: list[str], match_all: bool) -> tuple[str, list]:
+        """Запрос поиска вакансий по словам keywords (непустым) и его параметры"""
+        condition = (" AND " if match_all else " OR ").join(["vacancy_name ILIKE %s"] * len(keywords))
+        query_params = [' '.join(keywords)] + [f"%{self._escape_like(keyword)}%" for keyword in keywords]
+        return f"""
+                SELECT vacancy_name, salary_from, salary_to, url,
+                       word_similarity(%s, vacancy_name) AS rank
+                FROM vacancies
+                WHERE is_active AND ({condition})
+                ORDER BY rank DESC, salary_from, salary_to
+                """, query_params
+
+    @cached_report
+    def search_vacancies(self, keywords: list[str], match_all: bool = True) -> list:
+        """Поиск вакансий по словам в названии с использованием триграммного индекса.
+        match_all=True - в названии должны быть все слова, False - хотя бы одно.
+        Результаты упорядочены по убыванию релевантности: (vacancy_name, salary_from, salary_to, url, rank)"""
+        keywords = [keyword for keyword in keywords if keyword.strip()]
+        if not keywords:
+            return []
+
+        with self.cursor('search_vacancies') as cur:
+            cur.execute(*self._search_query(keywords, match_all))
             return cur.fetchall()
 
-    def print_info(self) -> None:
-        """Выводит результат различных запросов к БД к таблицам с компаниями и вакансиями, согласно выбранному
-        номеру case_num"""
-        while True:
-            print("\nВарианты вывода:")
-            [print(f"{k}: {v};") for k, v in DbManager.query_cases_dict.items()]
-            case_num = input("Введите номер варианта: ").strip()
-
-            if case_num == "1":
-                print(f"\n1. Список всех компаний и количество вакансий у каждой компании:")
-                [print(f"{item[0]}: {item[1]}шт.") for item in self.get_employers_and_vacancies_count()]
-
-            elif case_num == "2":
-                print(f"\n2. Список всех вакансий с указанием названия компании,названия вакансии и зарплаты "
-                      f"и ссылки на вакансию:")
-                [print(item) for item in self.get_all_vacancies()]
-
-            elif case_num == "3":
-                salary_avg = round(self.get_avg_salary()[0], 2)
-                print(f"\n3. Cредняя зарплата по вакансиям:\n{salary_avg}")
-
-            elif case_num == "4":
-                salary_avg = round(self.get_avg_salary()[0], 2)
-                print(f"\n4. Список всех вакансий, у которых зарплата выше средней ({salary_avg}) по всем вакансиям:")
-                [print(item) for item in self.get_vacancies_with_higher_salary()]
-
-            elif case_num == "5":
-                print(f"\n5. Список всех вакансий, в названии которых содержатся переданные в метод слова, "
-                      f"например python:")
-                [print(f"{item[0]}") for item in self.get_vacancies_with_keyword(keyword='Python')]
-
-            elif case_num == "0":
-                print(f"\n0. Выход из выбора вариантов.")
-                break
-            else:
-                print(f"\nНеверно задан номер, повторите ввод.")
-
-            input('\nНажмите Enter, чтобы продолжить...')
+    def iter_search_vacancies(self, keywords: list[str], match_all: bool = True,
+                              itersize: int = 2000) -> Iterator[tuple]:
+        """Потоковый вариант search_vacancies на серверном курсоре"""
+        keywords = [keyword for keyword in keywords if keyword.strip()]
+        if not keywords:
+            return iter(())
+        query, query_params = self._search_query(keywords, match_all)
+        return self.iter_query(query, query_params, itersize=itersize, label='iter_search_vacancies')
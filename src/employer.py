@@ -1,4 +1,5 @@
 class Employer:
+    __slots__ = ('id', 'name')
 
     def __init__(self, _id: int, _name: str):
         self.id = _id
@@ -14,3 +15,24 @@ class Employer:
               'employer_name': self.name
               }
 
+
+class EmployerRegistry:
+    """Реестр работодателей: хранит один объект Employer на каждый id,
+    чтобы тысячи вакансий одного работодателя ссылались на общий объект"""
+    __slots__ = ('_employers',)
+
+    def __init__(self):
+        self._employers = {}
+
+    def get(self, _id: int, _name: str) -> Employer:
+        """Возвращает общий объект Employer для _id, создавая его при первом обращении"""
+        employer = self._employers.get(_id)
+        if employer is None:
+            employer = self._employers[_id] = Employer(_id, _name)
+        return employer
+
+    def __len__(self):
+        return len(self._employers)
+
+    def __iter__(self):
+        return iter(self._employers.values())
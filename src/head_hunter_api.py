@@ -1,6 +1,16 @@
+import time
 import requests
 from abc import ABC, abstractmethod
+from contextlib import nullcontext
+from typing import Iterator
+from requests.adapters import HTTPAdapter
+from src.crawl_scheduler import CrawlScheduler, TokenBucket
+from src.crawl_snapshot import SnapshotStore
+from src.response_cache import ResponseCache
+from src.metrics import metrics
+from src.parallel_parser import ParallelParser, parse_record
 from src.vacancy import Vacancy
+from src.vacancy_frame import VacancyFrame
 
 
 class HeadHunterAPI:
@@ -8,22 +18,170 @@ class HeadHunterAPI:
     Класс для работы с API HeadHunter
     """
 
-    def __init__(self):
+    MAX_DEPTH = 2000
+    RETRY_STATUSES = (429, 500, 502, 503, 504)
+    # сетевые ошибки, после которых запрос повторяется: обрыв, таймаут, оборванное тело ответа
+    RETRY_ERRORS = (requests.ConnectionError, requests.Timeout, requests.exceptions.ChunkedEncodingError)
+
+    def __init__(self, max_workers: int = 8, requests_per_second: float = 10,
+                 max_retries: int = 5, backoff_factor: float = 0.5, cache: ResponseCache = None,
+                 snapshot_store: SnapshotStore = None, parser: ParallelParser = None,
+                 timeout: tuple[float, float] = (5, 30)):
         self.url = 'https://api.hh.ru/vacancies'
         self.headers = {'User-Agent': 'HH-User-Agent'}
         self.def_params = {'page': 0, 'per_page': 100}
+        self.max_workers = max_workers
+        self.rate_limiter = TokenBucket(requests_per_second) if requests_per_second else None
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        # таймауты (соединения, чтения) запроса, чтобы зависшее соединение не останавливало загрузку
+        self.timeout = timeout
+        self.cache = cache
+        # архив снимков: результат каждой загрузки сохраняется в нем в колоночном формате
+        self.snapshot_store = snapshot_store
+        self.last_snapshot = None
+        # разбор страниц в пуле процессов; без него страницы разбираются в текущем потоке
+        self.parser = parser
+        self._session = None
         super().__init__()
 
+    @property
+    def session(self) -> requests.Session:
+        """Общая keep-alive сессия с пулом соединений, размер пула равен числу потоков загрузки"""
+        if self._session is None:
+            self._session = requests.Session()
+            self._session.headers.update(self.headers)
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.max_workers)
+            self._session.mount('https://', adapter)
+            self._session.mount('http://', adapter)
+        return self._session
+
+    def close(self) -> None:
+        """Закрывает сессию и освобождает соединения пула"""
+        if self._session is not None:
+            self._session.close()
+            self._session = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _retry_delay(self, response, attempt: int) -> float:
+        """Пауза перед повтором: значение Retry-After из ответа либо экспоненциальная задержка"""
+        retry_after = response.headers.get('Retry-After') if response is not None else None
+        if retry_after and retry_after.isdigit():
+            return float(retry_after)
+        return self.backoff_factor * 2 ** attempt
+
+    def get_page(self, params: dict, page: int) -> dict:
+        """Загружает одну страницу выдачи HH с номером page, используя кэш ответов, если он задан"""
+        params = {**params, 'page': page}
+        if self.cache is None:
+            return self._request_page(params).json()
+
+        key = self.cache.make_key(self.url, params)
+        entry = self.cache.get(key)
+        if entry is not None and (self.cache.offline or self.cache.is_fresh(entry)):
+            return entry['body']
+        if self.cache.offline:
+            raise LookupError(f"Страница {params} отсутствует в кэше, а загрузка из сети отключена")
+
+        response = self._request_page(params, ResponseCache.validation_headers(entry) if entry else None)
+        if response.status_code == 304:
+            self.cache.refresh(key, entry)
+            return entry['body']
+        body = response.json()
+        self.cache.put(key, body, response.headers.get('ETag'), response.headers.get('Last-Modified'))
+        return body
+
+    def get_page_raw(self, params: dict, page: int):
+        """Загружает страницу выдачи без декодирования JSON - тело ответа в виде bytes, которое разбирается
+        в пуле процессов ParallelParser. При заданном кэше страница берется через get_page (dict)"""
+        if self.cache is not None:
+            return self.get_page(params, page)
+        return self._request_page({**params, 'page': page}).content
+
+    def _request_page(self, params: dict, headers: dict = None) -> requests.Response:
+        """Выполняет запрос страницы к HH.
+        При ответах 429/5xx, сетевых ошибках и таймаутах повторяет запрос с экспоненциальной задержкой"""
+        for attempt in range(self.max_retries + 1):
+            if self.rate_limiter:
+                self.rate_limiter.acquire()
+            start = time.perf_counter()
+            try:
+                response = self.session.get(self.url, params=params, headers=headers, timeout=self.timeout)
+            except self.RETRY_ERRORS:
+                if attempt == self.max_retries:
+                    raise
+                metrics.increment('hh_fetch_retries')
+                time.sleep(self._retry_delay(None, attempt))
+                continue
+            if response.status_code in self.RETRY_STATUSES and attempt < self.max_retries:
+                metrics.increment('hh_fetch_retries')
+                time.sleep(self._retry_delay(response, attempt))
+                continue
+            response.raise_for_status()
+            # в этап загрузки страниц попадают только успешные ответы, повторы считаются отдельно
+            if metrics.enabled:
+                metrics.record_stage('hh_fetch_page', time.perf_counter() - start, 1, len(response.content))
+            return response
+
+    def get_pages_count(self, first_page: dict, params: dict) -> int:
+        """Число доступных страниц выдачи с учетом ограничения HH на глубину выдачи"""
+        return min(first_page.get('pages', 1), self.MAX_DEPTH // params['per_page'])
+
     def load_vacancies(self, params):
         """ Загрузка вакансий из удаленного ресурса HH.ru"""
         params = {**self.def_params, **params}
-        hh_vacancies = []
-        page_max_count = 10
-        while params.get('page') != page_max_count:
-            response = requests.get(self.url, headers=self.headers, params=params)
-            params['page'] += 1
-            print(f"Чтение страницы hh №{params['page'] } из {page_max_count}")
-            hh_vacancies.extend(response.json()['items'])
-        params['page'] = 0
-        print() # hh_vacancies)
-        return Vacancy.cast_to_object_list(hh_vacancies)
+        if self.parser is not None:
+            scheduler = CrawlScheduler(self)
+            rows = self.parser.parse(scheduler.iter_pages(params, raw=True))
+            scheduler.check_shortfall(len(rows))
+            print()
+            vacancies = Vacancy.cast_rows_to_object_list(rows)
+        else:
+            hh_vacancies = CrawlScheduler(self).crawl(params)
+            print()
+            vacancies = Vacancy.cast_to_object_list(hh_vacancies)
+        if self.snapshot_store is not None:
+            self.last_snapshot = self.snapshot_store.save(VacancyFrame.from_vacancies(vacancies), params)
+        return vacancies
+
+    def _iter_page_rows(self, params: dict) -> Iterator[list[tuple]]:
+        """Строки вакансий (см. parallel_parser.parse_record) постранично: разбор в текущем потоке
+        или, если задан parser, порциями в пуле процессов"""
+        scheduler = CrawlScheduler(self)
+        if self.parser is None:
+            for items in scheduler.iter_pages(params):
+                with metrics.stage('parse') as stage:
+                    rows = [parse_record(item) for item in items]
+                    stage.add(items=len(rows))
+                yield rows
+            return
+        rows_count = 0
+        for rows in self.parser.iter_rows(scheduler.iter_pages(params, raw=True)):
+            rows_count += len(rows)
+            yield rows
+        scheduler.check_shortfall(rows_count)
+
+    def iter_rows(self, params, chunk_size: int = 500) -> Iterator[list[tuple]]:
+        """Потоковая загрузка вакансий строками parse_record порциями по chunk_size без создания объектов Vacancy,
+        например для StorageBackend.load_rows/sync_rows"""
+        params = {**self.def_params, **params}
+        # снимок дописывается по мере загрузки и сохраняется, только если загрузка дошла до конца
+        writer = self.snapshot_store.writer(params) if self.snapshot_store is not None else None
+        with writer or nullcontext():
+            chunk = []
+            for rows in self._iter_page_rows(params):
+                if writer is not None:
+                    writer.append(rows)
+                chunk.extend(rows)
+                if len(chunk) >= chunk_size:
+                    yield chunk
+                    chunk = []
+            if chunk:
+                yield chunk
+        if writer is not None:
+            self.last_snapshot = writer.name
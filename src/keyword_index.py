@@ -0,0 +1,65 @@
+import re
+from functools import lru_cache
+from typing import Iterable, List
+from src.vacancy import Vacancy
+
+
+class KeywordIndex:
+    """Инвертированный индекс слов по набору вакансий (название, обязанности, требования).
+    Строится один раз, после чего запросы из нескольких слов выполняются пересечением
+    (или объединением) списков вакансий по словам без повторного просмотра текстов.
+    В отличие от Utils.filter_vacancies, сравниваются целые слова без учета регистра и окончаний, а не подстроки"""
+
+    _TAG_PATTERN = re.compile(r'<[^>]+>')
+    _TOKEN_PATTERN = re.compile(r'[\w+#]+')
+
+    # окончания в порядке убывания длины, отсекаются при стемминге
+    _RU_SUFFIXES = sorted(('иями', 'ями', 'ами', 'ого', 'ему', 'ому', 'ыми', 'ими', 'ией', 'ий', 'ый', 'ой', 'ая',
+                           'яя', 'ое', 'ее', 'ые', 'ие', 'ых', 'их', 'ом', 'ем', 'ам', 'ям', 'ах', 'ях', 'ов', 'ев',
+                           'ей', 'ию', 'ия', 'ть', 'ать', 'ять', 'ить', 'ение', 'ения', 'а', 'я', 'о', 'е',
+                           'ы', 'и', 'у', 'ю', 'ь'), key=len, reverse=True)
+    _EN_SUFFIXES = sorted(('ing', 'ers', 'er', 'ed', 'es', 's', 'ly'), key=len, reverse=True)
+    _MIN_STEM_LENGTH = 3
+
+    def __init__(self, vacancies: Iterable[Vacancy]):
+        self.vacancies = list(vacancies)
+        self._postings = {}
+        for idx, vacancy in enumerate(self.vacancies):
+            text = ' '.join((vacancy.name or '', vacancy.responsibility or '', vacancy.requirement or ''))
+            for token in self.tokenize(text):
+                self._postings.setdefault(token, set()).add(idx)
+
+    @classmethod
+    @lru_cache(maxsize=65536)
+    def stem(cls, word: str) -> str:
+        """Упрощенный стемминг: отсечение самого длинного подходящего окончания"""
+        suffixes = cls._RU_SUFFIXES if re.search('[а-я]', word) else cls._EN_SUFFIXES
+        for suffix in suffixes:
+            if word.endswith(suffix) and len(word) - len(suffix) >= cls._MIN_STEM_LENGTH:
+                return word[:-len(suffix)]
+        return word
+
+    @classmethod
+    def tokenize(cls, text: str) -> set:
+        """Нормализует текст (без html-разметки сниппетов, нижний регистр, ё -> е) и возвращает основы слов"""
+        text = cls._TAG_PATTERN.sub(' ', text).lower().replace('ё', 'е')
+        return {cls.stem(token) for token in cls._TOKEN_PATTERN.findall(text)}
+
+    def _ids(self, keywords: List[str], match_all: bool) -> set:
+        postings = []
+        for keyword in keywords:
+            tokens = self.tokenize(keyword)
+            if not tokens:
+                continue
+            # слово из нескольких токенов (например "c++ developer") требует всех своих токенов
+            postings.append(set.intersection(*(self._postings.get(token, set()) for token in tokens)))
+        if not postings:
+            return set(range(len(self.vacancies)))
+        if match_all:
+            postings.sort(key=len)
+            return set.intersection(*postings)
+        return set.union(*postings)
+
+    def search(self, keywords: List[str], match_all: bool = True) -> List[Vacancy]:
+        """Вакансии, содержащие все (match_all=True) или хотя бы одно из слов keywords, в исходном порядке"""
+        return [self.vacancies[idx] for idx in sorted(self._ids(keywords, match_all))]
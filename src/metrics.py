@@ -0,0 +1,205 @@
+import json
+import logging
+import threading
+import time
+from bisect import bisect_left
+
+
+class _NoopStage:
+    """Заглушка замера этапа при выключенных метриках: без измерения времени и блокировок"""
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        pass
+
+    def add(self, items: int = 0, bytes_count: int = 0) -> None:
+        pass
+
+
+_NOOP_STAGE = _NoopStage()
+
+
+class _Stage:
+    """Замер одного выполнения этапа: время выполнения, число элементов и байт"""
+    __slots__ = ('_metrics', '_name', '_start', 'items', 'bytes_count')
+
+    def __init__(self, metrics, name: str):
+        self._metrics = metrics
+        self._name = name
+        self.items = 0
+        self.bytes_count = 0
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self._metrics.record_stage(self._name, time.perf_counter() - self._start, self.items, self.bytes_count)
+
+    def add(self, items: int = 0, bytes_count: int = 0) -> None:
+        self.items += items
+        self.bytes_count += bytes_count
+
+
+class Metrics:
+    """Сбор метрик этапов конвейера (загрузка, разбор, вставка, отчеты): время, число элементов,
+    объем загруженных данных, гистограммы задержек запросов и планы EXPLAIN отчетов.
+    По умолчанию выключен: stage() возвращает заглушку, observe() сразу возвращается"""
+
+    LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, float('inf'))
+
+    def __init__(self):
+        self.enabled = False
+        self.explain = False
+        self.sinks = []
+        self._lock = threading.Lock()
+        self.reset()
+
+    def enable(self, sinks: list = None, explain: bool = False) -> None:
+        """Включает сбор метрик. explain=True дополнительно сохраняет планы EXPLAIN (ANALYZE, BUFFERS)
+        запросов отчетов (запрос при этом выполняется дважды)"""
+        self.enabled = True
+        self.explain = explain
+        self.sinks = list(sinks or [])
+
+    def disable(self) -> None:
+        self.enabled = False
+        self.explain = False
+
+    def reset(self) -> None:
+        with self._lock:
+            self._stages = {}
+            self._histograms = {}
+            self._counters = {}
+            self._explains = []
+
+    def stage(self, name: str):
+        """Контекстный менеджер замера этапа name"""
+        if not self.enabled:
+            return _NOOP_STAGE
+        return _Stage(self, name)
+
+    def record_stage(self, name: str, seconds: float, items: int = 0, bytes_count: int = 0) -> None:
+        with self._lock:
+            stage = self._stages.setdefault(name, {'count': 0, 'seconds': 0.0, 'items': 0, 'bytes': 0})
+            stage['count'] += 1
+            stage['seconds'] += seconds
+            stage['items'] += items
+            stage['bytes'] += bytes_count
+
+    def increment(self, name: str, value: int = 1) -> None:
+        """Увеличивает счетчик событий name (например, повторов запросов)"""
+        if not self.enabled:
+            return
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + value
+
+    def observe(self, name: str, seconds: float, label: str = '') -> None:
+        """Добавляет значение задержки в гистограмму name (label различает, например, запросы отчетов)"""
+        if not self.enabled:
+            return
+        with self._lock:
+            histogram = self._histograms.setdefault(
+                (name, label), {'buckets': [0] * len(self.LATENCY_BUCKETS), 'sum': 0.0, 'count': 0})
+            histogram['buckets'][bisect_left(self.LATENCY_BUCKETS, seconds)] += 1
+            histogram['sum'] += seconds
+            histogram['count'] += 1
+
+    def record_explain(self, query: str, plan: list) -> None:
+        with self._lock:
+            self._explains.append({'query': ' '.join(query.split()), 'plan': plan})
+
+    def snapshot(self) -> dict:
+        """Текущие значения метрик. Для этапов добавляется производительность items_per_second"""
+        with self._lock:
+            stages = {name: {**stage,
+                             'items_per_second': stage['items'] / stage['seconds'] if stage['seconds'] else None}
+                      for name, stage in self._stages.items()}
+            histograms = [{'name': name, 'label': label,
+                           'buckets': dict(zip(self.LATENCY_BUCKETS, histogram['buckets'])),
+                           'sum': histogram['sum'], 'count': histogram['count']}
+                          for (name, label), histogram in self._histograms.items()]
+            return {'stages': stages, 'histograms': histograms, 'counters': dict(self._counters),
+                    'explains': list(self._explains)}
+
+    def flush(self) -> None:
+        """Передает текущие значения метрик во все подключенные приемники"""
+        snapshot = self.snapshot()
+        for sink in self.sinks:
+            sink.emit(snapshot)
+
+
+class LogSink:
+    """Приемник метрик, выводящий сводку по этапам в logging"""
+
+    def __init__(self, logger: logging.Logger = None, level: int = logging.INFO):
+        self.logger = logger or logging.getLogger('hh_metrics')
+        self.level = level
+
+    def emit(self, snapshot: dict) -> None:
+        for name, stage in snapshot['stages'].items():
+            self.logger.log(self.level, "%s: %d раз, %.3f с, %d шт., %d байт",
+                            name, stage['count'], stage['seconds'], stage['items'], stage['bytes'])
+        for histogram in snapshot['histograms']:
+            self.logger.log(self.level, "%s %s: %d запросов, среднее %.4f с", histogram['name'], histogram['label'],
+                            histogram['count'], histogram['sum'] / histogram['count'])
+        for name, value in snapshot['counters'].items():
+            self.logger.log(self.level, "%s: %d", name, value)
+
+
+class JsonFileSink:
+    """Приемник метрик, сохраняющий их в JSON-файл"""
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def emit(self, snapshot: dict) -> None:
+        histograms = [{**histogram, 'buckets': {str(le): count for le, count in histogram['buckets'].items()}}
+                      for histogram in snapshot['histograms']]
+        with open(self.path, 'w', encoding='utf-8') as file:
+            json.dump({**snapshot, 'histograms': histograms}, file, ensure_ascii=False, indent=2)
+
+
+class PrometheusTextSink:
+    """Приемник метрик в текстовом формате экспозиции Prometheus (например, для node_exporter textfile)"""
+
+    def __init__(self, path: str, prefix: str = 'hh'):
+        self.path = path
+        self.prefix = prefix
+
+    def render(self, snapshot: dict) -> str:
+        lines = []
+        for metric, field in (('stage_seconds_total', 'seconds'), ('stage_runs_total', 'count'),
+                              ('stage_items_total', 'items'), ('stage_bytes_total', 'bytes')):
+            lines.append(f"# TYPE {self.prefix}_{metric} counter")
+            lines += [f'{self.prefix}_{metric}{{stage="{name}"}} {stage[field]}'
+                      for name, stage in snapshot['stages'].items()]
+        if snapshot['counters']:
+            lines.append(f"# TYPE {self.prefix}_events_total counter")
+        for name, value in snapshot['counters'].items():
+            lines.append(f'{self.prefix}_events_total{{event="{name}"}} {value}')
+        typed = set()
+        for histogram in snapshot['histograms']:
+            name = f"{self.prefix}_{histogram['name']}"
+            if name not in typed:
+                lines.append(f"# TYPE {name} histogram")
+                typed.add(name)
+            label = f'query="{histogram["label"]}",' if histogram['label'] else ''
+            cumulative = 0
+            for le, count in histogram['buckets'].items():
+                cumulative += count
+                le_label = '+Inf' if le == float('inf') else le
+                lines.append(f'{name}_bucket{{{label}le="{le_label}"}} {cumulative}')
+            lines.append(f"{name}_sum{{{label.rstrip(',')}}} {histogram['sum']}")
+            lines.append(f"{name}_count{{{label.rstrip(',')}}} {histogram['count']}")
+        return '\n'.join(lines) + '\n'
+
+    def emit(self, snapshot: dict) -> None:
+        with open(self.path, 'w', encoding='utf-8') as file:
+            file.write(self.render(snapshot))
+
+
+metrics = Metrics()
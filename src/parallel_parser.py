@@ -0,0 +1,186 @@
+import json
+import multiprocessing
+import os
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from typing import Iterable, Iterator
+from src.metrics import metrics
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# employer_id вакансий без работодателя, как в Vacancy.cast_to_object_list
+NO_EMPLOYER_ID = 999999
+# ошибки разбора отдельной вакансии или страницы, которые попадают в отчет об ошибках
+PARSE_ERRORS = (KeyError, TypeError, ValueError, AttributeError)
+
+
+def loads(raw):
+    """Декодирует JSON (bytes или str), используя orjson, если он установлен"""
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+
+def _to_salary(value):
+    return None if value is None else int(value)
+
+
+def parse_record(record: dict) -> tuple:
+    """Проверяет вакансию из выдачи HH и преобразует ее в строку (vacancy_id, employer_id, employer_name,
+    vacancy_name, salary_from, salary_to, url, responsibility, requirement). Первые семь полей совпадают
+    с форматом VacancyFrame.from_rows и колонками загрузки в БД"""
+    salary = record.get('salary')
+    employer = record.get('employer') or {}
+    snippet = record.get('snippet') or {}
+    return (int(record['id']),
+            int(employer.get('id') or NO_EMPLOYER_ID),
+            employer.get('name') or '',
+            record.get('name') or '',
+            _to_salary(salary.get('from')) if salary else None,
+            _to_salary(salary.get('to')) if salary else None,
+            record.get('url') or '',
+            snippet.get('responsibility') or '',
+            snippet.get('requirement') or '')
+
+
+def _error(page_info: dict, index, record, error: Exception) -> dict:
+    return {'page': page_info,
+            'index': index,
+            'vacancy_id': record.get('id') if isinstance(record, dict) else None,
+            'error': f"{type(error).__name__}: {error}"}
+
+
+def parse_pages(batch: list[tuple[dict, object]]) -> tuple[list[tuple], list[dict]]:
+    """Разбирает порцию страниц [(параметры запроса страницы, bytes/str/dict)] в процессе пула.
+    Возвращает строки вакансий и ошибки разбора пропущенных страниц и вакансий"""
+    rows = []
+    errors = []
+    for page_info, page in batch:
+        try:
+            if isinstance(page, (bytes, str)):
+                page = loads(page)
+            items = page['items']
+        except PARSE_ERRORS as error:
+            errors.append(_error(page_info, None, None, error))
+            continue
+        for index, record in enumerate(items):
+            try:
+                rows.append(parse_record(record))
+            except PARSE_ERRORS as error:
+                errors.append(_error(page_info, index, record, error))
+    return rows, errors
+
+
+class ParallelParser:
+    """Разбор страниц выдачи HH в пуле процессов (при max_workers=1 - в текущем процессе) в строки parse_record.
+    Повторяющиеся вакансии отбрасываются, ошибки разбора собираются в errors"""
+
+    def __init__(self, max_workers: int = None, batch_pages: int = 8):
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.batch_pages = batch_pages
+        self.errors = []
+        self.rows_count = 0
+        self._executor = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def start(self) -> None:
+        """Запускает пул процессов, если разбор выполняется не в текущем процессе"""
+        if self.max_workers > 1 and self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.max_workers, mp_context=self._mp_context())
+
+    def close(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    @staticmethod
+    def _mp_context():
+        # не fork: в процессе уже могут работать потоки загрузки страниц
+        methods = multiprocessing.get_all_start_methods()
+        return multiprocessing.get_context('forkserver' if 'forkserver' in methods else 'spawn')
+
+    @property
+    def executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self.start()
+        return self._executor
+
+    def _batches(self, pages: Iterable) -> Iterator[list[tuple[dict, object]]]:
+        pages = iter(pages)
+        while True:
+            batch = list(islice(pages, self.batch_pages))
+            if not batch:
+                return
+            yield batch
+
+    def _iter_results(self, pages: Iterable) -> Iterator[tuple[list[tuple], list[dict]]]:
+        if self.max_workers == 1:
+            yield from map(parse_pages, self._batches(pages))
+            return
+
+        # уже декодированные страницы (первые страницы подзапросов, ответы из кэша) разбираются
+        # в текущем процессе: их передача в пул дороже самого разбора
+        decoded = []
+
+        def encoded_pages():
+            for page_info, page in pages:
+                if isinstance(page, dict):
+                    decoded.append((page_info, page))
+                else:
+                    yield page_info, page
+
+        batches = self._batches(encoded_pages())
+        # в обработке не больше двух порций на процесс, чтобы память не росла с объемом выдачи
+        in_flight = deque(self.executor.submit(parse_pages, batch)
+                          for _, batch in zip(range(self.max_workers * 2), batches))
+        while True:
+            if decoded:
+                result = parse_pages(decoded)
+                decoded.clear()
+                yield result
+            if not in_flight:
+                return
+            result = in_flight.popleft().result()
+            next_batch = next(batches, None)
+            if next_batch is not None:
+                in_flight.append(self.executor.submit(parse_pages, next_batch))
+            yield result
+
+    def iter_rows(self, pages: Iterable) -> Iterator[list[tuple]]:
+        """Генератор строк вакансий порциями (по одной на порцию страниц) по мере разбора.
+        pages - пары (параметры запроса страницы, страница), может быть генератором,
+        например CrawlScheduler.iter_pages(params, raw=True)"""
+        seen_ids = set()
+        for rows, errors in self._iter_results(pages):
+            self.errors.extend(errors)
+            unseen_rows = []
+            for row in rows:
+                if row[0] not in seen_ids:
+                    seen_ids.add(row[0])
+                    unseen_rows.append(row)
+            self.rows_count += len(unseen_rows)
+            yield unseen_rows
+
+    def parse(self, pages: Iterable) -> list[tuple]:
+        """Разбирает все страницы pages и возвращает список строк вакансий"""
+        with metrics.stage('parse_parallel') as stage:
+            rows = [row for rows in self.iter_rows(pages) for row in rows]
+            stage.add(items=len(rows))
+        return rows
+
+    def error_report(self) -> dict:
+        """Отчет об ошибках разбора: число разобранных вакансий, число ошибок по типам и сами ошибки"""
+        return {'rows_count': self.rows_count,
+                'errors_count': len(self.errors),
+                'errors_by_type': dict(Counter(error['error'].split(':', 1)[0] for error in self.errors)),
+                'errors': list(self.errors)}
@@ -0,0 +1,102 @@
+import functools
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+
+class QueryCache:
+    """Кэш результатов отчетов в памяти процесса с вытеснением LRU, сроком жизни записей ttl
+    и ограничением суммарного размера max_bytes. Записи привязаны к версии данных хранилища:
+    после загрузки или синхронизации данных версия увеличивается и старые записи не используются"""
+
+    def __init__(self, max_entries: int = 256, ttl: float = 300, max_bytes: int = 64 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def estimate_size(cls, value) -> int:
+        """Приблизительный размер результата отчета в байтах (списки строк, кортежи, словари)"""
+        size = sys.getsizeof(value)
+        if isinstance(value, dict):
+            size += sum(cls.estimate_size(key) + cls.estimate_size(item) for key, item in value.items())
+        elif isinstance(value, (list, tuple)):
+            size += sum(cls.estimate_size(item) for item in value)
+        return size
+
+    def get(self, key, data_version: int) -> tuple[bool, object]:
+        """Возвращает (True, значение) для действующей записи, иначе (False, None)"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, version, stored_at, size = entry
+                if version == data_version and time.monotonic() - stored_at < self.ttl:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return True, value
+                self._remove(key)
+            self.misses += 1
+            return False, None
+
+    def put(self, key, value, data_version: int) -> None:
+        size = self.estimate_size(value)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (value, data_version, time.monotonic(), size)
+            self._size += size
+            while len(self._entries) > self.max_entries or self._size > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+
+    def _remove(self, key) -> None:
+        self._size -= self._entries.pop(key)[3]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'entries': len(self._entries), 'bytes': self._size}
+
+
+def _freeze(value):
+    """Приводит аргументы отчета к хэшируемому виду для ключа кэша"""
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(item) for item in value)
+    if isinstance(value, dict):
+        return tuple(sorted((key, _freeze(item)) for key, item in value.items()))
+    return value
+
+
+def cached_report(method):
+    """Декоратор метода отчета хранилища: результат кэшируется в self.query_cache (если кэш задан)
+    по имени отчета и аргументам с учетом текущей версии данных self.data_version.
+    Результат из кэша возвращается тем же объектом, поэтому изменять его не следует"""
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        cache = self.query_cache
+        if cache is None:
+            return method(self, *args, **kwargs)
+        key = (method.__name__, _freeze(args), _freeze(kwargs))
+        # версия фиксируется до выполнения запроса: результат, полученный во время загрузки данных,
+        # сохранится под старой версией и не будет выдан после ее увеличения
+        data_version = self.data_version
+        hit, value = cache.get(key, data_version)
+        if hit:
+            return value
+        value = method(self, *args, **kwargs)
+        cache.put(key, value, data_version)
+        return value
+
+    return wrapper
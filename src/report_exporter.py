@@ -0,0 +1,99 @@
+import csv
+import json
+import os
+import sys
+from decimal import Decimal
+from typing import Iterable, TextIO
+from src.storage_backend import StorageBackend
+
+
+class ReportExporter:
+    """Неинтерактивная выгрузка отчетов (номера как в StorageBackend.query_cases_dict) в CSV или JSON Lines.
+    Все отчеты выполняются в одной транзакции-снимке только для чтения, строки записываются
+    по мере чтения курсора, без накопления результата в памяти"""
+
+    # номер отчета: (имя файла, названия колонок)
+    REPORTS = {
+        "1": ('employers_vacancies_count', ('employer_name', 'vacancies_count')),
+        "2": ('all_vacancies', ('employer_name', 'vacancy_name', 'salary_from', 'salary_to', 'url')),
+        "3": ('avg_salary', ('salary_from_avg',)),
+        "4": ('vacancies_with_higher_salary', ('vacancy_name', 'salary_from', 'salary_to')),
+        "5": ('vacancies_with_keyword', ('vacancy_name', 'salary_from', 'salary_to', 'url', 'rank')),
+    }
+    FORMATS = ('csv', 'jsonl')
+
+    def __init__(self, db_manager: StorageBackend, fmt: str = 'csv', output_dir: str = None):
+        if fmt not in self.FORMATS:
+            raise ValueError(f"Формат {fmt} не поддерживается, допустимые форматы: {', '.join(self.FORMATS)}")
+        if output_dir:
+            os.makedirs(output_dir, exist_ok=True)
+        self.db_manager = db_manager
+        self.fmt = fmt
+        self.output_dir = output_dir
+
+    def _rows(self, case_num: str, kwargs: dict) -> Iterable[tuple]:
+        if case_num == "1":
+            return self.db_manager.get_employers_and_vacancies_count()
+        elif case_num == "2":
+            return self.db_manager.iter_all_vacancies()
+        elif case_num == "3":
+            return [self.db_manager.get_avg_salary()]
+        elif case_num == "4":
+            return self.db_manager.iter_vacancies_with_higher_salary()
+        elif case_num == "5":
+            keywords = kwargs.get('keywords') or kwargs.get('keyword', 'Python').split()
+            return self.db_manager.iter_search_vacancies(keywords, kwargs.get('match_all', True))
+        raise ValueError(f"Неизвестный номер отчета {case_num}")
+
+    @staticmethod
+    def _json_default(value):
+        if isinstance(value, Decimal):
+            return float(value)
+        raise TypeError(f"Значение типа {type(value).__name__} не сериализуется в JSON")
+
+    def _write(self, file: TextIO, case_num: str, columns: tuple, rows: Iterable[tuple]) -> int:
+        rows_count = 0
+        if self.fmt == 'csv':
+            writer = csv.writer(file)
+            writer.writerow(columns)
+            for row in rows:
+                writer.writerow(row)
+                rows_count += 1
+        else:
+            # в общем потоке stdout строки разных отчетов различаются полем report
+            prefix = {'report': case_num} if file is sys.stdout else {}
+            for row in rows:
+                record = {**prefix, **dict(zip(columns, row))}
+                file.write(json.dumps(record, ensure_ascii=False, default=self._json_default) + '\n')
+                rows_count += 1
+        return rows_count
+
+    def export(self, reports: list[tuple[str, dict]]) -> list[tuple[str, int]]:
+        """Выгружает отчеты reports - список пар (номер отчета, dict аргументов), например
+        [("1", {}), ("5", {"keyword": "Python"})]. Каждый отчет пишется в отдельный файл каталога
+        output_dir (повторный отчет с тем же номером - в файл с суффиксом) или, если каталог не задан,
+        в stdout. Возвращает пары (номер отчета, число строк)"""
+        unknown = [case_num for case_num, _ in reports if case_num not in self.REPORTS]
+        if unknown:
+            # проверка до выгрузки, чтобы не оставлять частично записанный набор файлов
+            raise ValueError(f"Неизвестные номера отчетов: {', '.join(unknown)}, "
+                             f"допустимые номера: {', '.join(self.REPORTS)}")
+
+        exported = []
+        seen_counts = {}
+        with self.db_manager.snapshot():
+            for case_num, kwargs in reports:
+                name, columns = self.REPORTS[case_num]
+                rows = self._rows(case_num, kwargs or {})
+                if self.output_dir:
+                    seen_counts[case_num] = seen_counts.get(case_num, 0) + 1
+                    suffix = f"_{seen_counts[case_num]}" if seen_counts[case_num] > 1 else ''
+                    path = os.path.join(self.output_dir, f"{case_num}_{name}{suffix}.{self.fmt}")
+                    with open(path, 'w', encoding='utf-8', newline='') as file:
+                        exported.append((case_num, self._write(file, case_num, columns, rows)))
+                else:
+                    if self.fmt == 'csv':
+                        sys.stdout.write(f"# {case_num}. {StorageBackend.query_cases_dict[case_num]}\n")
+                    exported.append((case_num, self._write(sys.stdout, case_num, columns, rows)))
+                    sys.stdout.flush()
+        return exported
@@ -0,0 +1,115 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Optional
+
+
+class ResponseCache:
+    """Дисковый кэш ответов HH API. Ключ - url и параметры запроса.
+    Поддерживает TTL, LRU-вытеснение по суммарному размеру файлов, условную ревалидацию
+    (If-None-Match/If-Modified-Since) и автономный режим воспроизведения без сети"""
+
+    def __init__(self, cache_dir: str, ttl: float = 3600, max_size_bytes: int = 256 * 1024 * 1024,
+                 offline: bool = False):
+        self.cache_dir = cache_dir
+        self.ttl = ttl
+        self.max_size_bytes = max_size_bytes
+        self.offline = offline
+        self._lock = threading.Lock()
+        os.makedirs(cache_dir, exist_ok=True)
+        # текущий размер файлов кэша, чтобы каталог просматривался только при превышении max_size_bytes
+        self._size = self._scan_size()
+
+    def _scan_size(self) -> int:
+        return sum(entry.stat().st_size for entry in os.scandir(self.cache_dir) if entry.name.endswith('.json'))
+
+    @staticmethod
+    def _normalize_params(params: dict) -> list:
+        """Приводит параметры к детерминированному виду, чтобы одинаковые запросы давали один ключ"""
+        normalized = []
+        for key in sorted(params):
+            value = params[key]
+            if isinstance(value, (str, int, float)) or value is None:
+                normalized.append([key, str(value)])
+            else:
+                normalized.append([key, sorted(str(item) for item in value)])
+        return normalized
+
+    def make_key(self, url: str, params: dict) -> str:
+        raw = json.dumps([url, self._normalize_params(params)], ensure_ascii=False)
+        return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def get(self, key: str) -> Optional[dict]:
+        """Возвращает запись кэша по ключу и отмечает ее как недавно использованную"""
+        path = self._path(key)
+        try:
+            with open(path, encoding='utf-8') as file:
+                entry = json.load(file)
+        except (OSError, ValueError):
+            return None
+        os.utime(path)
+        return entry
+
+    def is_fresh(self, entry: dict) -> bool:
+        return time.time() - entry['stored_at'] < self.ttl
+
+    @staticmethod
+    def validation_headers(entry: dict) -> dict:
+        """Заголовки условного запроса для ревалидации устаревшей записи"""
+        headers = {}
+        if entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def put(self, key: str, body: dict, etag: str = None, last_modified: str = None) -> None:
+        """Сохраняет тело ответа и валидаторы в кэш"""
+        entry = {'stored_at': time.time(), 'etag': etag, 'last_modified': last_modified, 'body': body}
+        tmp_path = f"{self._path(key)}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as file:
+            json.dump(entry, file, ensure_ascii=False)
+        with self._lock:
+            try:
+                old_size = os.stat(self._path(key)).st_size
+            except OSError:
+                old_size = 0
+            self._size += os.stat(tmp_path).st_size - old_size
+            os.replace(tmp_path, self._path(key))
+            if self._size > self.max_size_bytes:
+                self._evict()
+
+    def refresh(self, key: str, entry: dict) -> None:
+        """Продлевает срок жизни записи после ответа 304 Not Modified"""
+        self.put(key, entry['body'], entry.get('etag'), entry.get('last_modified'))
+
+    def _evict(self) -> None:
+        """Удаляет давно не использованные записи, пока размер кэша превышает max_size_bytes.
+        Вызывается под self._lock"""
+        files = []
+        for entry in os.scandir(self.cache_dir):
+            if entry.name.endswith('.json'):
+                stat = entry.stat()
+                files.append((stat.st_mtime, stat.st_size, entry.path))
+        total_size = sum(size for _, size, _ in files)
+        for _, size, path in sorted(files):
+            if total_size <= self.max_size_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total_size -= size
+        self._size = total_size
+
+    def clear(self) -> None:
+        with self._lock:
+            for entry in os.scandir(self.cache_dir):
+                if entry.name.endswith('.json'):
+                    os.remove(entry.path)
+            self._size = 0
@@ -0,0 +1,88 @@
+from bisect import bisect_left
+from typing import List, Optional
+from src.vacancy import Vacancy
+
+
+class _IntervalNode:
+    """Узел центрированного дерева интервалов"""
+    __slots__ = ('center', 'by_low', 'by_high', 'left', 'right')
+
+    def __init__(self, center: int, by_low: list, by_high: list, left, right):
+        self.center = center
+        self.by_low = by_low
+        self.by_high = by_high
+        self.left = left
+        self.right = right
+
+
+class SalaryIndex:
+    """Индекс по зарплатам коллекции вакансий. Строится один раз и отвечает на запросы
+    "вакансии с зарплатой, пересекающей [low, high]" за O(log n + k) (дерево интервалов)
+    и "top_n вакансий по зарплате" за O(log n + top_n) (отсортированные верхние границы)"""
+
+    def __init__(self, vacancies: List[Vacancy]):
+        self.vacancies = list(vacancies)
+        intervals = [(*vacancy.salary.bounds(), idx) for idx, vacancy in enumerate(self.vacancies)]
+        self._root = self._build(intervals)
+        # при равных зарплатах обратный проход сохраняет исходный порядок вакансий
+        self._by_upper = sorted(intervals, key=lambda interval: (interval[1], -interval[2]))
+        self._uppers = [interval[1] for interval in self._by_upper]
+
+    @classmethod
+    def _build(cls, intervals: list) -> Optional[_IntervalNode]:
+        if not intervals:
+            return None
+        lows = sorted(low for low, _, _ in intervals)
+        center = lows[len(lows) // 2]
+        left, right, here = [], [], []
+        for interval in intervals:
+            if interval[1] < center:
+                left.append(interval)
+            elif interval[0] > center:
+                right.append(interval)
+            else:
+                here.append(interval)
+        return _IntervalNode(center,
+                             sorted(here, key=lambda interval: interval[0]),
+                             sorted(here, key=lambda interval: interval[1], reverse=True),
+                             cls._build(left), cls._build(right))
+
+    def _overlapping_ids(self, low: int, high: int) -> list[int]:
+        found = []
+        stack = [self._root]
+        while stack:
+            node = stack.pop()
+            if node is None:
+                continue
+            if high < node.center:
+                for interval in node.by_low:
+                    if interval[0] > high:
+                        break
+                    found.append(interval[2])
+                stack.append(node.left)
+            elif low > node.center:
+                for interval in node.by_high:
+                    if interval[1] < low:
+                        break
+                    found.append(interval[2])
+                stack.append(node.right)
+            else:
+                found.extend(interval[2] for interval in node.by_low)
+                stack.append(node.left)
+                stack.append(node.right)
+        return found
+
+    def overlapping(self, low: int, high: int) -> List[Vacancy]:
+        """Вакансии с зарплатой, пересекающей интервал [low, high], в исходном порядке коллекции"""
+        return [self.vacancies[idx] for idx in sorted(self._overlapping_ids(low, high))]
+
+    def with_upper_at_least(self, salary: int) -> List[Vacancy]:
+        """Вакансии, верхняя граница зарплаты которых не меньше salary, по убыванию зарплаты"""
+        start = bisect_left(self._uppers, salary)
+        return [self.vacancies[interval[2]] for interval in reversed(self._by_upper[start:])]
+
+    def top(self, top_n: int) -> List[Vacancy]:
+        """top_n вакансий с наибольшей верхней границей зарплаты"""
+        if top_n <= 0:
+            return []
+        return [self.vacancies[interval[2]] for interval in reversed(self._by_upper[-top_n:])]
@@ -1,4 +1,6 @@
 class SalaryRange:
+    __slots__ = ('from_salary', 'to_salary')
+
     def __init__(self, from_salary: int = None, to_salary: int = None):
         self.from_salary = from_salary
         self.to_salary = to_salary
@@ -21,4 +23,18 @@ class SalaryRange:
             concreate_salary = self.to_salary if not self.from_salary else self.from_salary
             return range(concreate_salary, concreate_salary + 1)
 
+    def bounds(self) -> tuple[int, int]:
+        """Границы зарплаты (нижняя, верхняя) включительно, согласованные с get_range(), без построения range.
+        Перепутанные границы (from_salary > to_salary) упорядочиваются, а не дают пустой интервал"""
+        if self.from_salary and self.to_salary:
+            return min(self.from_salary, self.to_salary), max(self.from_salary, self.to_salary)
+        elif not self.from_salary and not self.to_salary:
+            return 0, 0
+        else:
+            concreate_salary = self.to_salary if not self.from_salary else self.from_salary
+            return concreate_salary, concreate_salary
 
+    def overlaps(self, low: int, high: int) -> bool:
+        """Проверяет пересечение зарплаты с интервалом [low, high] за O(1)"""
+        salary_low, salary_high = self.bounds()
+        return salary_low <= high and low <= salary_high
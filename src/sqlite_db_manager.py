@@ -0,0 +1,359 @@
+import hashlib
+import json
+import math
+import sqlite3
+import statistics
+import time
+from contextlib import contextmanager
+from itertools import islice
+from typing import Iterable, Iterator
+from src.metrics import metrics
+from src.query_cache import QueryCache, cached_report
+from src.storage_backend import StorageBackend
+
+
+class SqliteDbManager(StorageBackend):
+    """Хранилище вакансий во встроенной БД SQLite: не требует сервера БД, запросы выполняются в процессе.
+    Используются WAL-журнал, кэш подготовленных выражений sqlite3 и пакетная вставка executemany
+    в одной транзакции"""
+
+    chunk_size = 1000
+
+    def __init__(self, db_path: str, query_cache: QueryCache = None):
+        self.db_path = db_path
+        self._connection = None
+        self.query_cache = query_cache
+
+    def create_connection(self) -> None:
+        if not self._connection:
+            self._connection = sqlite3.connect(self.db_path, check_same_thread=False, cached_statements=256)
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute("PRAGMA synchronous=NORMAL")
+            self._connection.execute("PRAGMA foreign_keys=ON")
+            # lower() SQLite работает только с ASCII, для поиска по кириллице используется str.lower
+            self._connection.create_function('py_lower', 1, lambda value: value.lower() if value else value,
+                                             deterministic=True)
+
+    def close_connection(self) -> None:
+        if self._connection:
+            self._connection.close()
+            self._connection = None
+
+    def prepare_storage(self, rebuild: bool = False) -> None:
+        if rebuild:
+            self._connection.executescript("""
+            DROP TABLE IF EXISTS vacancies;
+            DROP TABLE IF EXISTS employers;
+            """)
+        self._connection.executescript(f"""
+        CREATE TABLE IF NOT EXISTS employers (
+            employer_id INTEGER PRIMARY KEY,
+            employer_name TEXT NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS vacancies (
+            vacancy_id INTEGER PRIMARY KEY,
+            employer_id INTEGER REFERENCES employers(employer_id),
+            vacancy_name TEXT NOT NULL,
+            salary_from INTEGER,
+            salary_to INTEGER,
+            url TEXT NOT NULL,
+            content_hash TEXT,
+            is_active INTEGER NOT NULL DEFAULT 1
+        );
+        CREATE INDEX IF NOT EXISTS idx_vacancies_salary_from ON vacancies (salary_from);
+        CREATE INDEX IF NOT EXISTS idx_vacancies_salary_to ON vacancies (salary_to);
+        CREATE INDEX IF NOT EXISTS idx_vacancies_employer_id ON vacancies (employer_id);
+        CREATE INDEX IF NOT EXISTS idx_employers_name ON employers (employer_name);
+        CREATE INDEX IF NOT EXISTS idx_vacancies_page_key
+        ON vacancies (employer_id, COALESCE(salary_from, {self.NULL_SALARY_KEY}), vacancy_id) WHERE is_active;
+        """)
+        self.bump_data_version()
+        print(f"Созданы таблицы employers и vacancies в {self.db_path}")
+
+    @staticmethod
+    def _content_hash(employer_id, vacancy_name, salary_from, salary_to, url) -> str:
+        """Хэш содержимого вакансии, совпадающий с DbManager.vacancy_hash_sql:
+        json.dumps дает тот же текст JSON-массива, что и json_build_array(...)::text в PostgreSQL"""
+        values = [employer_id, vacancy_name, salary_from, salary_to, url]
+        return hashlib.md5(json.dumps(values, ensure_ascii=False).encode('utf-8')).hexdigest()
+
+    def _chunks(self, rows: Iterable[tuple]) -> Iterator[tuple[list, list]]:
+        """Порции строк (employers, vacancies) для executemany, без построения полного списка"""
+        rows = iter(rows)
+        while True:
+            chunk = list(islice(rows, self.chunk_size))
+            if not chunk:
+                return
+            employers = {row[1]: row[2] for row in chunk}
+            yield list(employers.items()), [
+                (vacancy_id, employer_id, name, salary_from, salary_to, url,
+                 self._content_hash(employer_id, name, salary_from, salary_to, url))
+                for vacancy_id, employer_id, _, name, salary_from, salary_to, url, *_ in chunk]
+
+    def load_rows(self, rows: Iterable[tuple]) -> int:
+        """Загрузка вакансий пакетами executemany в одной транзакции. Существующие строки не изменяются"""
+        rows_count = 0
+        with metrics.stage('db_insert') as stage, self._connection:
+            for employers, vacancies in self._chunks(rows):
+                self._connection.executemany(
+                    "INSERT OR IGNORE INTO employers (employer_id, employer_name) VALUES (?, ?)", employers)
+                self._connection.executemany("""
+                    INSERT OR IGNORE INTO vacancies
+                        (vacancy_id, employer_id, vacancy_name, salary_from, salary_to, url, content_hash)
+                    VALUES (?, ?, ?, ?, ?, ?, ?)""", vacancies)
+                rows_count += len(vacancies)
+            stage.add(items=rows_count)
+        self.bump_data_version()
+        return rows_count
+
+    def sync_rows(self, rows: Iterable[tuple], delete_missing: bool = False) -> dict:
+        """Инкрементальная синхронизация с текущей выдачей, аналогичная DbManager.sync_rows"""
+        loaded = employers_changed = vacancies_changed = 0
+        with metrics.stage('db_sync') as stage, self._connection:
+            self._connection.execute("CREATE TEMP TABLE IF NOT EXISTS sync_ids (vacancy_id INTEGER PRIMARY KEY)")
+            self._connection.execute("DELETE FROM sync_ids")
+            for employers, vacancies in self._chunks(rows):
+                employers_changed += self._connection.executemany("""
+                    INSERT INTO employers (employer_id, employer_name) VALUES (?, ?)
+                    ON CONFLICT (employer_id) DO UPDATE
+                    SET employer_name = excluded.employer_name
+                    WHERE employers.employer_name IS NOT excluded.employer_name""", employers).rowcount
+                vacancies_changed += self._connection.executemany("""
+                    INSERT INTO vacancies
+                        (vacancy_id, employer_id, vacancy_name, salary_from, salary_to, url, content_hash, is_active)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, 1)
+                    ON CONFLICT (vacancy_id) DO UPDATE
+                    SET employer_id = excluded.employer_id,
+                        vacancy_name = excluded.vacancy_name,
+                        salary_from = excluded.salary_from,
+                        salary_to = excluded.salary_to,
+                        url = excluded.url,
+                        content_hash = excluded.content_hash,
+                        is_active = 1
+                    WHERE vacancies.content_hash IS NOT excluded.content_hash OR NOT vacancies.is_active""",
+                                                                  vacancies).rowcount
+                self._connection.executemany("INSERT OR IGNORE INTO sync_ids (vacancy_id) VALUES (?)",
+                                             ((row[0],) for row in vacancies))
+                loaded += len(vacancies)
+
+            missing_condition = "vacancy_id NOT IN (SELECT vacancy_id FROM sync_ids)"
+            if delete_missing:
+                vacancies_removed = self._connection.execute(
+                    f"DELETE FROM vacancies WHERE {missing_condition}").rowcount
+            else:
+                vacancies_removed = self._connection.execute(
+                    f"UPDATE vacancies SET is_active = 0 WHERE is_active AND {missing_condition}").rowcount
+            stage.add(items=loaded)
+        self.bump_data_version()
+
+        return {'loaded': loaded,
+                'employers_changed': employers_changed,
+                'vacancies_changed': vacancies_changed,
+                'vacancies_removed': vacancies_removed}
+
+    def _fetchall(self, label: str, query: str, query_params=()) -> list:
+        """Выполняет запрос отчета label; при включенных метриках записывает его задержку"""
+        if not metrics.enabled:
+            return self._connection.execute(query, query_params).fetchall()
+        start = time.perf_counter()
+        rows = self._connection.execute(query, query_params).fetchall()
+        metrics.observe('db_query_seconds', time.perf_counter() - start, label)
+        return rows
+
+    @contextmanager
+    def snapshot(self):
+        """Транзакция чтения: в режиме WAL все запросы внутри нее видят один снимок данных"""
+        self._connection.commit()
+        self._connection.execute("BEGIN")
+        try:
+            yield self
+        finally:
+            self._connection.rollback()
+
+    def iter_query(self, query: str, query_params=(), itersize: int = 2000) -> Iterator[tuple]:
+        """Отдает строки результата порциями по itersize по мере чтения курсора"""
+        cur = self._connection.execute(query, query_params)
+        try:
+            while True:
+                rows = cur.fetchmany(itersize)
+                if not rows:
+                    return
+                yield from rows
+        finally:
+            cur.close()
+
+    def iter_all_vacancies(self, itersize: int = 2000) -> Iterator[tuple]:
+        return self.iter_query("""
+                           SELECT employer_name, vacancy_name, salary_from, salary_to, url
+                           FROM vacancies
+                           JOIN employers USING (employer_id)
+                           WHERE is_active
+                           ORDER BY employer_name, salary_from NULLS LAST, salary_to NULLS LAST
+                           """, itersize=itersize)
+
+    def iter_vacancies_with_higher_salary(self, itersize: int = 2000) -> Iterator[tuple]:
+        return self.iter_query("""
+                           WITH salary_avg AS (SELECT AVG(salary_from) AS avg
+                                               FROM vacancies
+                                               WHERE salary_from IS NOT NULL AND is_active)
+                           SELECT vacancy_name, salary_from, salary_to
+                           FROM vacancies, salary_avg
+                           WHERE is_active AND (salary_from > salary_avg.avg OR salary_to > salary_avg.avg)
+                           ORDER BY salary_from NULLS LAST, salary_to NULLS LAST
+                           """, itersize=itersize)
+
+    @cached_report
+    def get_employers_and_vacancies_count(self) -> list:
+        """Получает список всех компаний и количество вакансий у каждой компании"""
+        return self._fetchall('get_employers_and_vacancies_count', """
+                            SELECT employer_name, COUNT(vacancy_id)
+                            FROM employers
+                            LEFT JOIN vacancies ON vacancies.employer_id = employers.employer_id
+                                               AND vacancies.is_active
+                            GROUP BY employer_name
+                            """)
+
+    @cached_report
+    def get_all_vacancies(self) -> list:
+        """Получает список всех вакансий с указанием названия компании,
+        названия вакансии и зарплаты и ссылки на вакансию"""
+        return self._fetchall('get_all_vacancies', """
+                           SELECT employer_name, vacancy_name, salary_from, salary_to, url
+                           FROM vacancies
+                           JOIN employers USING (employer_id)
+                           WHERE is_active
+                           ORDER BY employer_name, salary_from NULLS LAST, salary_to NULLS LAST
+                           """)
+
+    def get_vacancies_page(self, after: tuple = None, limit: int = 20) -> list:
+        """Страница списка всех вакансий с keyset-пагинацией, аналогичная DbManager.get_vacancies_page"""
+        salary_key = f"COALESCE(salary_from, {self.NULL_SALARY_KEY})"
+        condition = (f"AND employer_name >= ? AND (employer_name, {salary_key}, vacancy_id) > (?, ?, ?)"
+                     if after else "")
+        return self._fetchall('get_vacancies_page', f"""
+                           SELECT employer_name, vacancy_name, salary_from, salary_to, url, vacancy_id
+                           FROM vacancies
+                           JOIN employers USING (employer_id)
+                           WHERE is_active {condition}
+                           ORDER BY employer_name, {salary_key}, vacancy_id
+                           LIMIT ?
+                           """, (*((after[0], *after) if after else ()), limit))
+
+    @cached_report
+    def get_avg_salary(self) -> tuple:
+        """Получает среднюю зарплату по вакансиям"""
+        return self._fetchall('get_avg_salary', """
+                         SELECT AVG(salary_from) as salary_from_avg
+                         FROM vacancies
+                         WHERE salary_from IS NOT NULL AND is_active
+                         """)[0]
+
+    @cached_report
+    def get_vacancies_with_higher_salary(self) -> list:
+        """Получает список всех вакансий, у которых зарплата выше средней по всем вакансиям."""
+        return self._fetchall('get_vacancies_with_higher_salary', """
+                           WITH salary_avg AS (SELECT AVG(salary_from) AS avg
+                                               FROM vacancies
+                                               WHERE salary_from IS NOT NULL AND is_active)
+                           SELECT vacancy_name, salary_from, salary_to
+                           FROM vacancies, salary_avg
+                           WHERE is_active AND (salary_from > salary_avg.avg OR salary_to > salary_avg.avg)
+                           ORDER BY salary_from NULLS LAST, salary_to NULLS LAST
+                           """)
+
+    @staticmethod
+    def _percentile(sorted_values: list, fraction: float):
+        """Перцентиль с линейной интерполяцией, как percentile_cont в PostgreSQL"""
+        if not sorted_values:
+            return None
+        position = fraction * (len(sorted_values) - 1)
+        lower = math.floor(position)
+        upper = min(lower + 1, len(sorted_values) - 1)
+        return float(sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (position - lower))
+
+    @cached_report
+    def get_salary_report(self, buckets_count: int = 10) -> dict:
+        """Аналитика по зарплатам за один проход по таблице vacancies (SQLite не поддерживает
+        percentile_cont, поэтому статистика считается по результату одного запроса в Python).
+        Формат результата совпадает с DbManager.get_salary_report"""
+        rows = self._fetchall('get_salary_report', """
+                    SELECT employer_name, vacancy_name, salary_from, salary_to
+                    FROM vacancies
+                    JOIN employers USING (employer_id)
+                    WHERE is_active
+                    """)
+        salaries = sorted(row[2] for row in rows if row[2] is not None)
+        avg = statistics.fmean(salaries) if salaries else None
+
+        employers = {}
+        for employer_name, _, salary_from, _ in rows:
+            employer = employers.setdefault(employer_name, {'salaries': [], 'count': 0})
+            employer['count'] += 1
+            if salary_from is not None:
+                employer['salaries'].append(salary_from)
+        by_employer = []
+        for employer_name in sorted(employers):
+            employer_salaries = sorted(employers[employer_name]['salaries'])
+            by_employer.append((employer_name,
+                                statistics.fmean(employer_salaries) if employer_salaries else None,
+                                self._percentile(employer_salaries, 0.5),
+                                employers[employer_name]['count']))
+
+        histogram = []
+        if salaries:
+            low, high = salaries[0], salaries[-1] + 1
+            bucket_width = (high - low) / buckets_count
+            counts = [0] * buckets_count
+            for salary in salaries:
+                counts[min(int((salary - low) / bucket_width), buckets_count - 1)] += 1
+            histogram = [(low + bucket * bucket_width, low + (bucket + 1) * bucket_width, count)
+                         for bucket, count in enumerate(counts) if count]
+
+        above_avg = []
+        if avg is not None:
+            above_avg = sorted(((vacancy_name, salary_from, salary_to)
+                                for _, vacancy_name, salary_from, salary_to in rows
+                                if (salary_from is not None and salary_from > avg)
+                                or (salary_to is not None and salary_to > avg)),
+                               key=lambda row: (row[1] is None, row[1] or 0, row[2] is None, row[2] or 0))
+
+        percentiles = {25: self._percentile(salaries, 0.25), 50: self._percentile(salaries, 0.5),
+                       75: self._percentile(salaries, 0.75), 90: self._percentile(salaries, 0.9)}
+        return {
+            'avg': avg,
+            'median': percentiles[50],
+            'percentiles': percentiles,
+            'count': len(salaries),
+            'by_employer': by_employer,
+            'histogram': histogram,
+            'above_avg': above_avg,
+        }
+
+    @staticmethod
+    def _search_query(keywords: list[str], match_all: bool) -> tuple[str, list]:
+        """Запрос поиска вакансий по словам keywords (непустым, в нижнем регистре) и его параметры"""
+        matches = ["(instr(py_lower(vacancy_name), ?) > 0)"] * len(keywords)
+        condition = (" AND " if match_all else " OR ").join(matches)
+        return f"""
+                SELECT vacancy_name, salary_from, salary_to, url,
+                       CAST({' + '.join(matches)} AS REAL) / {len(keywords)} AS rank
+                FROM vacancies
+                WHERE is_active AND ({condition})
+                ORDER BY rank DESC, salary_from NULLS LAST, salary_to NULLS LAST
+                """, keywords * 2
+
+    @cached_report
+    def search_vacancies(self, keywords: list[str], match_all: bool = True) -> list:
+        """Поиск вакансий по словам в названии без учета регистра (в том числе кириллицы).
+        Релевантность - доля найденных в названии слов. Формат строк совпадает с DbManager.search_vacancies"""
+        keywords = [keyword.lower() for keyword in keywords if keyword.strip()]
+        if not keywords:
+            return []
+        return self._fetchall('search_vacancies', *self._search_query(keywords, match_all))
+
+    def iter_search_vacancies(self, keywords: list[str], match_all: bool = True,
+                              itersize: int = 2000) -> Iterator[tuple]:
+        keywords = [keyword.lower() for keyword in keywords if keyword.strip()]
+        if not keywords:
+            return iter(())
+        return self.iter_query(*self._search_query(keywords, match_all), itersize=itersize)
@@ -0,0 +1,177 @@
+from abc import ABC, abstractmethod
+from typing import Iterable, Iterator
+from src.vacancy import Vacancy
+
+
+class StorageBackend(ABC):
+    """Интерфейс хранилища вакансий: загрузка данных и отчеты.
+    Реализации - DbManager (PostgreSQL) и SqliteDbManager (встроенная SQLite)"""
+
+    query_cases_dict = {"1": "Список всех компаний и количество вакансий у каждой компании",
+                        "2": "Список всех вакансий с указанием названия компании,названия вакансии"
+                             " и зарплаты и ссылки на вакансию",
+                        "3": "Cредняя зарплата по вакансиям",
+                        "4": "Список всех вакансий, у которых зарплата выше средней по всем вакансиям",
+                        "5": "Список всех вакансий, в названии которых содержатся переданные в метод слова,"
+                             " например python",
+                        "0": "Выход"}
+
+    # ключ сортировки вакансий без зарплаты в get_vacancies_page: в конце, как NULL в get_all_vacancies
+    NULL_SALARY_KEY = 2147483647
+
+    # кэш результатов отчетов (QueryCache) и версия данных, увеличиваемая при каждой загрузке
+    query_cache = None
+    data_version = 0
+
+    def bump_data_version(self) -> None:
+        """Отмечает изменение данных: результаты отчетов в кэше перестают использоваться"""
+        self.data_version += 1
+        if self.query_cache is not None:
+            self.query_cache.clear()
+
+    def __enter__(self):
+        self.create_connection()
+        return self
+
+    def __exit__(self, *exc):
+        self.close_connection()
+
+    @abstractmethod
+    def create_connection(self) -> None:
+        pass
+
+    @abstractmethod
+    def close_connection(self) -> None:
+        pass
+
+    @abstractmethod
+    def prepare_storage(self, rebuild: bool = False) -> None:
+        """Создает хранилище и таблицы; при rebuild=True предварительно удаляет существующие данные"""
+        pass
+
+    @abstractmethod
+    def load_rows(self, rows: Iterable[tuple]) -> int:
+        """Самый быстрый для хранилища способ первичной загрузки вакансий из строк (vacancy_id, employer_id,
+        employer_name, vacancy_name, salary_from, salary_to, url, ...), например HeadHunterAPI.iter_rows.
+        Поля после url не загружаются. Возвращает число строк"""
+        pass
+
+    @abstractmethod
+    def sync_rows(self, rows: Iterable[tuple], delete_missing: bool = False) -> dict:
+        """Инкрементальная синхронизация таблиц со строками вакансий в формате load_rows"""
+        pass
+
+    def load_database(self, vacancies: Iterable[Vacancy]) -> int:
+        """Первичная загрузка объектов Vacancy, см. load_rows"""
+        return self.load_rows(vacancy.to_row() for vacancy in vacancies)
+
+    def sync_database(self, vacancies: Iterable[Vacancy], delete_missing: bool = False) -> dict:
+        """Синхронизация с объектами Vacancy, см. sync_rows"""
+        return self.sync_rows((vacancy.to_row() for vacancy in vacancies), delete_missing)
+
+    @abstractmethod
+    def snapshot(self):
+        """Контекстный менеджер транзакции только для чтения, в которой все отчеты видят один снимок данных"""
+        pass
+
+    @abstractmethod
+    def iter_all_vacancies(self, itersize: int = 2000) -> Iterator[tuple]:
+        """Потоковый вариант get_all_vacancies"""
+        pass
+
+    @abstractmethod
+    def iter_vacancies_with_higher_salary(self, itersize: int = 2000) -> Iterator[tuple]:
+        """Потоковый вариант get_vacancies_with_higher_salary"""
+        pass
+
+    @abstractmethod
+    def iter_search_vacancies(self, keywords: list[str], match_all: bool = True,
+                              itersize: int = 2000) -> Iterator[tuple]:
+        """Потоковый вариант search_vacancies"""
+        pass
+
+    @abstractmethod
+    def get_employers_and_vacancies_count(self) -> list:
+        pass
+
+    @abstractmethod
+    def get_all_vacancies(self) -> list:
+        pass
+
+    @abstractmethod
+    def get_vacancies_page(self, after: tuple = None, limit: int = 20) -> list:
+        pass
+
+    @abstractmethod
+    def get_avg_salary(self) -> tuple:
+        pass
+
+    @abstractmethod
+    def get_vacancies_with_higher_salary(self) -> list:
+        pass
+
+    @abstractmethod
+    def get_salary_report(self, buckets_count: int = 10) -> dict:
+        pass
+
+    @abstractmethod
+    def search_vacancies(self, keywords: list[str], match_all: bool = True) -> list:
+        pass
+
+    def get_vacancies_with_keyword(self, keyword: str) -> list:
+        """Получает список всех вакансий, в названии которых содержатся переданные в метод слова, например python"""
+        return self.search_vacancies(keyword.split())
+
+    def iter_vacancies_pages(self, page_size: int = 20) -> Iterator[list]:
+        """Постраничный обход списка всех вакансий через keyset-пагинацию"""
+        after = None
+        while True:
+            page = self.get_vacancies_page(after, page_size)
+            if not page:
+                return
+            yield page
+            last_row = page[-1]
+            after = (last_row[0], self.NULL_SALARY_KEY if last_row[2] is None else last_row[2], last_row[5])
+
+    def print_info(self) -> None:
+        """Выводит результат различных запросов к БД к таблицам с компаниями и вакансиями, согласно выбранному
+        номеру case_num"""
+        while True:
+            print("\nВарианты вывода:")
+            [print(f"{k}: {v};") for k, v in StorageBackend.query_cases_dict.items()]
+            case_num = input("Введите номер варианта: ").strip()
+
+            if case_num == "1":
+                print(f"\n1. Список всех компаний и количество вакансий у каждой компании:")
+                [print(f"{item[0]}: {item[1]}шт.") for item in self.get_employers_and_vacancies_count()]
+
+            elif case_num == "2":
+                print(f"\n2. Список всех вакансий с указанием названия компании,названия вакансии и зарплаты "
+                      f"и ссылки на вакансию:")
+                for page in self.iter_vacancies_pages():
+                    [print(item[:5]) for item in page]
+                    if input('\nEnter - следующая страница, q - завершить вывод: ').strip().lower() == 'q':
+                        break
+
+            elif case_num == "3":
+                salary_avg = round(self.get_avg_salary()[0], 2)
+                print(f"\n3. Cредняя зарплата по вакансиям:\n{salary_avg}")
+
+            elif case_num == "4":
+                salary_report = self.get_salary_report()
+                salary_avg = round(salary_report['avg'], 2)
+                print(f"\n4. Список всех вакансий, у которых зарплата выше средней ({salary_avg}) по всем вакансиям:")
+                [print(item) for item in salary_report['above_avg']]
+
+            elif case_num == "5":
+                print(f"\n5. Список всех вакансий, в названии которых содержатся переданные в метод слова, "
+                      f"например python:")
+                [print(f"{item[0]}") for item in self.get_vacancies_with_keyword(keyword='Python')]
+
+            elif case_num == "0":
+                print(f"\n0. Выход из выбора вариантов.")
+                break
+            else:
+                print(f"\nНеверно задан номер, повторите ввод.")
+
+            input('\nНажмите Enter, чтобы продолжить...')
@@ -7,7 +7,9 @@ class Utils:
 
     @staticmethod
     def filter_vacancies(vacancies: List[Vacancy], filter_words):
-        """Фильтрация вакансий по наличию в содержимом ряда атрибутов хотя бы одного из ключевых слов filter_words"""
+        """Фильтрация вакансий по наличию в содержимом ряда атрибутов хотя бы одного из ключевых слов filter_words.
+        Слова ищутся как подстроки; для многократного поиска по словам (с учетом регистра и окончаний)
+        служит KeywordIndex.search"""
         if len(filter_words) == 1 and filter_words[0].strip() == '':
             return vacancies
 
@@ -20,13 +22,19 @@ class Utils:
     @staticmethod
     def get_vacancies_by_salary(vacancies: List[Vacancy], salary_range: range):
         """Получение вакансии с ЗП в указанном диапазоне salary_range. Не учитывается валюта оплаты"""
+        if not salary_range:
+            return []
+        low, high = salary_range[0], salary_range[-1]
         filter_vacancies = [vacancy for vacancy in vacancies
-                            if Utils.non_empty_intersection(vacancy.salary.get_range(), salary_range)]
+                            if vacancy.salary.overlaps(low, high)]
         return filter_vacancies
 
     @staticmethod
     def non_empty_intersection(a, b):
         """Поиск есть ли пересечение двух множеств"""
+        if isinstance(a, range) and isinstance(b, range) and a.step == b.step == 1:
+            # для непрерывных диапазонов достаточно сравнить границы
+            return max(a.start, b.start) < min(a.stop, b.stop)
         smaller, bigger = a, b
         if len(a) < len(b):
             smaller, bigger = bigger, smaller
@@ -39,7 +47,7 @@ class Utils:
     def sort_vacancies_by_salary(vacancies: List[Vacancy]):
         """Сортировка вакансий по возрастанию ЗП"""
         vacancies = sorted(vacancies,
-                           key=lambda x: x.salary.get_range()[-1],
+                           key=lambda x: x.salary.bounds()[1],
                            reverse=True)
         return vacancies
 
@@ -1,16 +1,21 @@
 from typing import List
 from src.salary_range import SalaryRange
-from src.employer import Employer
+from src.employer import Employer, EmployerRegistry
+from src.metrics import metrics
 
 
 class Vacancy:
+    __slots__ = ('id', 'name', 'url', '__salary', 'employer', 'responsibility', 'requirement')
 
-    def __init__(self, _id: int, name: str, url: str,  salary: SalaryRange, employer: Employer):
+    def __init__(self, _id: int, name: str, url: str,  salary: SalaryRange, employer: Employer,
+                 responsibility: str = '', requirement: str = ''):
         self.id = _id
         self.name = name
         self.url = url
         self.salary = salary
         self.employer = employer
+        self.responsibility = responsibility
+        self.requirement = requirement
 
     def __str__(self):
         return (f"Название: {self.name}\n"
@@ -24,42 +29,54 @@ class Vacancy:
         return hash(self.id)
 
     @staticmethod
-    def cast_to_object_list(dct_vacancies: List[dict]):
-        """Преобразует список hh_vacancies в список объектов Vacancy"""
-
-        def hh_to_object(dct_vacancy: dict):
-            """Преобразует  hh_vacancy в объект Vacancy"""
-            _id = int(dct_vacancy.get('id'))
-            name = dct_vacancy.get('name', '')
-            url = dct_vacancy.get('url', '')
-            # responsibility = Vacancy.get_without_none(dct_vacancy.get('snippet', {}), 'responsibility')
-
-            salary_dict = dct_vacancy.get('salary')
-            salary = SalaryRange() if not salary_dict else SalaryRange(salary_dict['from'], salary_dict['to'])
-
-            # employer_dict = dct_vacancy.get('employer')
-            employer_id = int(Vacancy.get_without_none(dct_vacancy.get('employer', {}), 'id', replacement=999999))
-            employer_name = Vacancy.get_without_none(dct_vacancy.get('employer', {}), 'name')
-
-            return Vacancy(_id, name, url, salary, Employer(employer_id, employer_name))
-
-        vacancies = list(map(hh_to_object, dct_vacancies))
+    def cast_to_object_list(dct_vacancies: List[dict], employer_registry: EmployerRegistry = None):
+        """Преобразует список hh_vacancies в список объектов Vacancy.
+        Работодатели берутся из employer_registry, поэтому вакансии одного работодателя
+        ссылаются на общий объект Employer"""
+        get_employer = (employer_registry or EmployerRegistry()).get
+        vacancies = []
+        append = vacancies.append
+        with metrics.stage('parse') as stage:
+            for dct_vacancy in dct_vacancies:
+                salary_dict = dct_vacancy.get('salary')
+                employer_dict = dct_vacancy.get('employer') or {}
+                snippet_dict = dct_vacancy.get('snippet') or {}
+                append(Vacancy(int(dct_vacancy['id']),
+                               dct_vacancy.get('name', ''),
+                               dct_vacancy.get('url', ''),
+                               SalaryRange(salary_dict['from'], salary_dict['to']) if salary_dict else SalaryRange(),
+                               get_employer(int(employer_dict.get('id') or 999999), employer_dict.get('name') or ''),
+                               snippet_dict.get('responsibility') or '',
+                               snippet_dict.get('requirement') or ''))
+            stage.add(items=len(vacancies))
         return vacancies
 
     @staticmethod
-    def to_object(dct_vacancy: dict):
+    def cast_rows_to_object_list(rows: List[tuple], employer_registry: EmployerRegistry = None):
+        """Преобразует строки вакансий ParallelParser (см. parallel_parser.parse_record) в список объектов Vacancy"""
+        get_employer = (employer_registry or EmployerRegistry()).get
+        return [Vacancy(vacancy_id, name, url, SalaryRange(salary_from, salary_to),
+                        get_employer(employer_id, employer_name), responsibility, requirement)
+                for (vacancy_id, employer_id, employer_name, name, salary_from, salary_to, url,
+                     responsibility, requirement) in rows]
+
+    @staticmethod
+    def to_object(dct_vacancy: dict, employer_registry: EmployerRegistry = None):
         """Преобразует dict в объект Vacancy"""
         _id = dct_vacancy.get('id')
         name = dct_vacancy.get('name', '')
         url = dct_vacancy.get('url', '')
-        # responsibility = Vacancy.get_without_none(dct_vacancy, 'responsibility')
+        responsibility = Vacancy.get_without_none(dct_vacancy, 'responsibility')
+        requirement = Vacancy.get_without_none(dct_vacancy, 'requirement')
         salary_from = dct_vacancy.get('salary_from')
         salary_to = dct_vacancy.get('salary_to')
 
         employer_id = int(dct_vacancy.get('employer_id'))
         employer_name = dct_vacancy.get('employer_name')
 
-        return Vacancy(_id, name, url, SalaryRange(salary_from, salary_to), Employer(employer_id, employer_name))
+        employer = (employer_registry.get(employer_id, employer_name) if employer_registry
+                    else Employer(employer_id, employer_name))
+        return Vacancy(_id, name, url, SalaryRange(salary_from, salary_to), employer, responsibility, requirement)
 
     @staticmethod
     def get_without_none(dct, key, replacement=''):
@@ -79,6 +96,8 @@ class Vacancy:
             'salary_to': self.salary.to_salary,
             'employer_id': self.employer.id,
             'employer_name': self.employer.name,
+            'responsibility': self.responsibility,
+            'requirement': self.requirement,
         }
 
     def to_sql_dict(self):
@@ -92,6 +111,12 @@ class Vacancy:
             'salary_to': self.salary.to_salary,
         }
 
+    def to_row(self) -> tuple:
+        """Строка вакансии (vacancy_id, employer_id, employer_name, vacancy_name, salary_from, salary_to, url)
+        для StorageBackend.load_rows/sync_rows и VacancyFrame.from_rows"""
+        return (self.id, self.employer.id, self.employer.name, self.name,
+                self.salary.from_salary, self.salary.to_salary, self.url)
+
     # salary getter and setter
     @property
     def salary(self):
@@ -0,0 +1,170 @@
+import numpy as np
+from typing import Iterable, Iterator, List
+from src.employer import Employer
+from src.salary_range import SalaryRange
+from src.vacancy import Vacancy
+
+
+class StringTable:
+    """Компактное хранение повторяющихся строк: уникальные значения в списке, строки - индексы в нем"""
+
+    def __init__(self, codes: np.ndarray, values: list):
+        self.codes = codes
+        self.values = values
+
+    @classmethod
+    def from_strings(cls, strings: Iterable[str]) -> 'StringTable':
+        positions = {}
+        codes = np.fromiter((positions.setdefault(string, len(positions)) for string in strings), dtype=np.int32)
+        return cls(codes, list(positions))
+
+    def take(self, indices: np.ndarray) -> 'StringTable':
+        return StringTable(self.codes[indices], self.values)
+
+    def __getitem__(self, idx: int) -> str:
+        return self.values[self.codes[idx]]
+
+    def __len__(self):
+        return len(self.codes)
+
+
+class VacancyFrame:
+    """Колоночное представление набора вакансий на массивах NumPy для векторной фильтрации,
+    сортировки и группировки. Объекты Vacancy создаются только для возвращаемых строк (to_vacancies).
+    Отсутствующая граница зарплаты хранится как 0, как и в SalaryRange"""
+
+    def __init__(self, ids: np.ndarray, employer_ids: np.ndarray, salary_from: np.ndarray, salary_to: np.ndarray,
+                 names: StringTable, urls: StringTable, employer_names: dict):
+        self.ids = ids
+        self.employer_ids = employer_ids
+        self.salary_from = salary_from
+        self.salary_to = salary_to
+        self.names = names
+        self.urls = urls
+        self.employer_names = employer_names
+        # границы зарплаты с той же семантикой, что у SalaryRange.bounds()
+        salary_low = np.where(salary_from > 0, salary_from, salary_to)
+        salary_high = np.where(salary_to > 0, salary_to, salary_from)
+        self.salary_low = np.minimum(salary_low, salary_high)
+        self.salary_high = np.maximum(salary_low, salary_high)
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[tuple]) -> 'VacancyFrame':
+        """Строит фрейм из строк (vacancy_id, employer_id, employer_name, vacancy_name, salary_from, salary_to, url)"""
+        rows = list(rows)
+        employer_names = {}
+        for row in rows:
+            employer_names.setdefault(row[1], row[2])
+        return cls(np.fromiter((row[0] for row in rows), dtype=np.int64, count=len(rows)),
+                   np.fromiter((row[1] for row in rows), dtype=np.int64, count=len(rows)),
+                   np.fromiter((row[4] or 0 for row in rows), dtype=np.int64, count=len(rows)),
+                   np.fromiter((row[5] or 0 for row in rows), dtype=np.int64, count=len(rows)),
+                   StringTable.from_strings(row[3] for row in rows),
+                   StringTable.from_strings(row[6] for row in rows),
+                   employer_names)
+
+    @classmethod
+    def from_vacancies(cls, vacancies: Iterable[Vacancy]) -> 'VacancyFrame':
+        """Строит фрейм из результата Vacancy.cast_to_object_list"""
+        return cls.from_rows((vacancy.id, vacancy.employer.id, vacancy.employer.name, vacancy.name,
+                              vacancy.salary.from_salary, vacancy.salary.to_salary, vacancy.url)
+                             for vacancy in vacancies)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def take(self, indices: np.ndarray) -> 'VacancyFrame':
+        """Новый фрейм из строк с индексами (или по булевой маске) indices"""
+        if indices.dtype == bool:
+            indices = np.flatnonzero(indices)
+        return VacancyFrame(self.ids[indices], self.employer_ids[indices],
+                            self.salary_from[indices], self.salary_to[indices],
+                            self.names.take(indices), self.urls.take(indices), self.employer_names)
+
+    def salary_mask(self, low: int, high: int) -> np.ndarray:
+        """Маска вакансий, зарплата которых пересекается с интервалом [low, high]"""
+        return (self.salary_low <= high) & (self.salary_high >= low)
+
+    def filter_by_salary(self, low: int, high: int) -> 'VacancyFrame':
+        return self.take(self.salary_mask(low, high))
+
+    def sort_by_salary(self, descending: bool = True) -> 'VacancyFrame':
+        """Стабильная сортировка по верхней границе зарплаты"""
+        order = np.argsort(-self.salary_high if descending else self.salary_high, kind='stable')
+        return self.take(order)
+
+    def top(self, top_n: int) -> 'VacancyFrame':
+        """top_n вакансий с наибольшей зарплатой: partition и сортировка только выбранных строк.
+        Результат совпадает с первыми top_n строками sort_by_salary(): из равных пороговому значению
+        зарплат берутся строки с меньшими индексами"""
+        if top_n <= 0:
+            return self.take(np.empty(0, dtype=np.int64))
+        if top_n >= len(self):
+            return self.sort_by_salary()
+        negated = -self.salary_high
+        threshold = np.partition(negated, top_n - 1)[top_n - 1]
+        above = np.flatnonzero(negated < threshold)
+        ties = np.flatnonzero(negated == threshold)[:top_n - len(above)]
+        candidates = np.concatenate((above, ties))
+        order = candidates[np.lexsort((candidates, negated[candidates]))]
+        return self.take(order)
+
+    def group_by_employer(self) -> List[tuple]:
+        """Количество вакансий и средняя нижняя граница зарплаты (по указанным зарплатам) по работодателям:
+        список (employer_id, employer_name, count, avg_salary_from)"""
+        employer_ids, inverse, counts = np.unique(self.employer_ids, return_inverse=True, return_counts=True)
+        has_salary = self.salary_from > 0
+        salary_sums = np.bincount(inverse, weights=np.where(has_salary, self.salary_from, 0),
+                                  minlength=len(employer_ids))
+        salary_counts = np.bincount(inverse, weights=has_salary, minlength=len(employer_ids))
+        with np.errstate(invalid='ignore', divide='ignore'):
+            salary_avgs = salary_sums / salary_counts
+        return [(int(employer_id), self.employer_names.get(int(employer_id)), int(count),
+                 None if np.isnan(avg) else float(avg))
+                for employer_id, count, avg in zip(employer_ids, counts, salary_avgs)]
+
+    def diff(self, previous: 'VacancyFrame') -> dict:
+        """Сравнение с более ранним набором вакансий previous (например, снимком прошлой загрузки):
+        новые и снятые вакансии (фреймы) и вакансии с изменившейся зарплатой -
+        список (vacancy_id, old_salary_from, old_salary_to, salary_from, salary_to)"""
+        _, previous_idx, current_idx = np.intersect1d(previous.ids, self.ids, return_indices=True)
+        changed = ((previous.salary_from[previous_idx] != self.salary_from[current_idx])
+                   | (previous.salary_to[previous_idx] != self.salary_to[current_idx]))
+        previous_idx, current_idx = previous_idx[changed], current_idx[changed]
+        salary_changed = [(vacancy_id, old_from or None, old_to or None, new_from or None, new_to or None)
+                          for vacancy_id, old_from, old_to, new_from, new_to
+                          in zip(self.ids[current_idx].tolist(),
+                                 previous.salary_from[previous_idx].tolist(), previous.salary_to[previous_idx].tolist(),
+                                 self.salary_from[current_idx].tolist(), self.salary_to[current_idx].tolist())]
+        return {'new': self.take(~np.isin(self.ids, previous.ids)),
+                'removed': previous.take(~np.isin(previous.ids, self.ids)),
+                'salary_changed': salary_changed}
+
+    def iter_rows(self, chunk_size: int = 10000) -> Iterator[List[tuple]]:
+        """Отдает строки фрейма (vacancy_id, employer_id, employer_name, vacancy_name, salary_from, salary_to, url)
+        порциями по chunk_size. Колонки читаются срезами, поэтому колонки снимка, отображенные в память,
+        не материализуются целиком"""
+        names, urls = self.names.values, self.urls.values
+        for start in range(0, len(self), chunk_size):
+            end = start + chunk_size
+            yield [(vacancy_id, employer_id, self.employer_names.get(employer_id), names[name_code],
+                    salary_from or None, salary_to or None, urls[url_code])
+                   for vacancy_id, employer_id, salary_from, salary_to, name_code, url_code in zip(
+                       self.ids[start:end].tolist(), self.employer_ids[start:end].tolist(),
+                       self.salary_from[start:end].tolist(), self.salary_to[start:end].tolist(),
+                       self.names.codes[start:end].tolist(), self.urls.codes[start:end].tolist())]
+
+    def iter_vacancies(self, chunk_size: int = 10000) -> Iterator[Vacancy]:
+        """Отдает строки фрейма объектами Vacancy по одной, например для загрузки в БД без полного списка.
+        Работодатель один на все вакансии с его employer_id"""
+        employers = {}
+        for rows in self.iter_rows(chunk_size):
+            for vacancy_id, employer_id, employer_name, name, salary_from, salary_to, url in rows:
+                employer = employers.get(employer_id)
+                if employer is None:
+                    employer = employers[employer_id] = Employer(employer_id, employer_name)
+                yield Vacancy(vacancy_id, name, url, SalaryRange(salary_from, salary_to), employer)
+
+    def to_vacancies(self) -> List[Vacancy]:
+        """Материализует строки фрейма в объекты Vacancy"""
+        return list(self.iter_vacancies())
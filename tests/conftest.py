@@ -0,0 +1,9 @@
+import pytest
+from src.sqlite_db_manager import SqliteDbManager
+
+
+@pytest.fixture
+def db_manager(tmp_path):
+    with SqliteDbManager(str(tmp_path / 'vacancies.sqlite3')) as db_manager:
+        db_manager.prepare_storage(rebuild=True)
+        yield db_manager
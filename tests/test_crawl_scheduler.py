@@ -0,0 +1,42 @@
+from datetime import datetime, timedelta
+import pytest
+from benchmarks.hh_stub import HHStubServer
+from benchmarks.synthetic import SyntheticHH
+from src import crawl_scheduler
+from src.head_hunter_api import HeadHunterAPI
+from src.response_cache import ResponseCache
+
+
+@pytest.mark.parametrize('period_days', [30, 90])
+def test_load_vacancies_past_depth_limit_without_gaps(period_days):
+    # один из 5 работодателей с ~2900 вакансиями превышает ограничение глубины выдачи в 2000
+    synthetic = SyntheticHH(6000, 5, period_days=period_days)
+    employer_ids = synthetic.employer_ids()
+
+    with HHStubServer(synthetic) as stub, HeadHunterAPI(requests_per_second=None) as hh_api:
+        hh_api.url = stub.url
+        vacancies = hh_api.load_vacancies({'employer_id': employer_ids})
+
+    assert sorted(vacancy.id for vacancy in vacancies) == [int(vacancy['id']) for vacancy in synthetic.vacancies()]
+
+
+def test_offline_replay_reuses_stored_plan(tmp_path, monkeypatch):
+    synthetic = SyntheticHH(6000, 5)
+    employer_ids = synthetic.employer_ids()
+    with HHStubServer(synthetic) as stub, HeadHunterAPI(requests_per_second=None,
+                                                        cache=ResponseCache(str(tmp_path))) as hh_api:
+        hh_api.url = stub.url
+        crawled_ids = sorted(vacancy.id for vacancy in hh_api.load_vacancies({'employer_id': employer_ids}))
+
+    # окна дат нового плана сдвинулись бы вместе с часами, воспроизведение должно использовать сохраненный план
+    class Later(datetime):
+        @classmethod
+        def now(cls, tz=None):
+            return datetime.now(tz) + timedelta(hours=3)
+
+    monkeypatch.setattr(crawl_scheduler, 'datetime', Later)
+    with HeadHunterAPI(requests_per_second=None, cache=ResponseCache(str(tmp_path), offline=True)) as hh_api:
+        hh_api.url = stub.url
+        replayed_ids = sorted(vacancy.id for vacancy in hh_api.load_vacancies({'employer_id': employer_ids}))
+
+    assert replayed_ids == crawled_ids == [int(vacancy['id']) for vacancy in synthetic.vacancies()]
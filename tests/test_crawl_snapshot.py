@@ -0,0 +1,51 @@
+import json
+import os
+import zlib
+import numpy as np
+import pytest
+from src.crawl_snapshot import SnapshotStore
+from tests.test_vacancy_frame import random_frame
+
+
+def frame_rows(frame) -> list:
+    return [row for rows in frame.iter_rows(chunk_size=64) for row in rows]
+
+
+def test_writer_appends_chunks_into_loadable_snapshot(tmp_path):
+    frame = random_frame(1000)
+    rows = frame_rows(frame)
+    store = SnapshotStore(str(tmp_path))
+
+    with store.writer({'text': 'python'}) as writer:
+        for start in range(0, len(rows), 300):
+            writer.append(rows[start:start + 300])
+
+    loaded = store.load(writer.name)
+    assert isinstance(loaded.ids, np.memmap)
+    assert frame_rows(loaded) == rows
+    assert store.meta(writer.name)['vacancies_count'] == 1000
+    assert store.load(store.save(frame)).ids.tolist() == frame.ids.tolist()
+
+
+def test_writer_aborts_on_error(tmp_path):
+    store = SnapshotStore(str(tmp_path))
+    with pytest.raises(RuntimeError):
+        with store.writer() as writer:
+            writer.append(frame_rows(random_frame(10)))
+            raise RuntimeError
+    assert os.listdir(tmp_path) == []
+
+
+def test_loads_format_version_1(tmp_path):
+    frame = random_frame(20)
+    path = tmp_path / 'v1'
+    path.mkdir()
+    for column, array in zip(SnapshotStore.ARRAY_COLUMNS, (frame.ids, frame.employer_ids, frame.salary_from,
+                                                          frame.salary_to, frame.names.codes, frame.urls.codes)):
+        np.save(str(path / f'{column}.npy'), array)
+    strings = {'names': frame.names.values, 'urls': frame.urls.values,
+               'employers': list(frame.employer_names.items())}
+    (path / SnapshotStore.STRINGS_FILE).write_bytes(zlib.compress(json.dumps(strings).encode('utf-8')))
+    (path / SnapshotStore.META_FILE).write_text(json.dumps({'format_version': 1, 'name': 'v1'}))
+
+    assert frame_rows(SnapshotStore(str(tmp_path)).load('v1')) == frame_rows(frame)
@@ -0,0 +1,62 @@
+import threading
+import time
+import pytest
+from psycopg2.pool import PoolError
+from src.db_manager import DbManager
+
+
+class FakeConnection:
+    def rollback(self):
+        pass
+
+
+class FakePool:
+    def getconn(self):
+        return FakeConnection()
+
+    def putconn(self, conn):
+        pass
+
+
+def pooled_manager(pool_timeout: float = None) -> DbManager:
+    db_manager = DbManager('vacancies', {}, pool_size=1, pool_timeout=pool_timeout)
+    db_manager._pool = FakePool()
+    db_manager._pool_slots = threading.BoundedSemaphore(1)
+    return db_manager
+
+
+def release_later(db_manager: DbManager, delay: float) -> threading.Thread:
+    holding = threading.Event()
+
+    def hold():
+        with db_manager.connection():
+            holding.set()
+            time.sleep(delay)
+
+    thread = threading.Thread(target=hold)
+    thread.start()
+    holding.wait()
+    return thread
+
+
+def test_checkout_waits_for_free_connection_without_timeout():
+    db_manager = pooled_manager()
+    thread = release_later(db_manager, 0.2)
+
+    start = time.perf_counter()
+    with db_manager.connection() as conn:
+        assert isinstance(conn, FakeConnection)
+    thread.join()
+
+    assert time.perf_counter() - start >= 0.15
+    assert db_manager.pool_stats()['checkouts'] == 2
+
+
+def test_checkout_fails_after_pool_timeout():
+    db_manager = pooled_manager(pool_timeout=0.05)
+    thread = release_later(db_manager, 0.3)
+
+    with pytest.raises(PoolError):
+        with db_manager.connection():
+            pass
+    thread.join()
@@ -0,0 +1,35 @@
+from unittest import mock
+import pytest
+import requests
+from src.head_hunter_api import HeadHunterAPI
+
+
+def make_response(status_code: int, content: bytes = b'{"items": []}') -> requests.Response:
+    response = requests.Response()
+    response.status_code = status_code
+    response._content = content
+    return response
+
+
+@pytest.fixture
+def hh_api():
+    with HeadHunterAPI(requests_per_second=None, max_retries=3, backoff_factor=0, timeout=(1, 2)) as hh_api:
+        yield hh_api
+
+
+def test_request_retries_timeouts_and_broken_bodies(hh_api):
+    get = mock.Mock(side_effect=[requests.ReadTimeout(), requests.exceptions.ChunkedEncodingError(),
+                                 make_response(200)])
+    with mock.patch.object(requests.Session, 'get', get):
+        assert hh_api.get_page({'per_page': 100}, 0) == {'items': []}
+
+    assert get.call_count == 3
+    assert all(call.kwargs['timeout'] == (1, 2) for call in get.call_args_list)
+
+
+def test_request_gives_up_after_max_retries(hh_api):
+    get = mock.Mock(side_effect=requests.ConnectTimeout())
+    with mock.patch.object(requests.Session, 'get', get), pytest.raises(requests.ConnectTimeout):
+        hh_api.get_page({'per_page': 100}, 0)
+
+    assert get.call_count == 4
@@ -0,0 +1,41 @@
+from src.employer import Employer
+from src.keyword_index import KeywordIndex
+from src.salary_range import SalaryRange
+from src.vacancy import Vacancy
+
+
+def make_vacancy(vacancy_id: int, name: str, responsibility: str = '', requirement: str = '') -> Vacancy:
+    return Vacancy(vacancy_id, name, f'https://api.hh.ru/vacancies/{vacancy_id}', SalaryRange(),
+                   Employer(1, 'Компания'), responsibility, requirement)
+
+
+def test_tokenize_strips_tags_and_normalizes_case():
+    assert KeywordIndex.tokenize('<highlighttext>Python</highlighttext> и C++/C#, Ёлки') == \
+        {'python', 'и', 'c++', 'c#', 'елк'}
+
+
+def test_stem_removes_russian_and_english_endings():
+    assert {KeywordIndex.stem(word) for word in ('разработчик', 'разработчика', 'разработчиков')} == {'разработчик'}
+    assert {KeywordIndex.stem(word) for word in ('developer', 'developers', 'developing')} == {'develop'}
+    # короткие основы не укорачиваются
+    assert KeywordIndex.stem('sql') == 'sql'
+    assert KeywordIndex.stem('ели') == 'ели'
+
+
+def test_search_intersects_or_unites_postings():
+    index = KeywordIndex([
+        make_vacancy(1, 'Python разработчик', requirement='Знание <highlighttext>SQL</highlighttext>'),
+        make_vacancy(2, 'Java developer', responsibility='Разработка сервисов на Python'),
+        make_vacancy(3, 'Аналитик данных', requirement='SQL, Excel'),
+    ])
+
+    def ids(keywords, match_all=True):
+        return [vacancy.id for vacancy in index.search(keywords, match_all)]
+
+    assert ids(['python', 'sql']) == [1]
+    assert ids(['python', 'sql'], match_all=False) == [1, 2, 3]
+    assert ids(['Разработчики']) == [1]
+    assert ids(['developers']) == [2]
+    assert ids(['python developer']) == [2]
+    assert ids(['golang']) == []
+    assert ids([]) == [1, 2, 3]
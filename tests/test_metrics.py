@@ -0,0 +1,22 @@
+from benchmarks.hh_stub import HHStubServer
+from benchmarks.synthetic import SyntheticHH
+from src.head_hunter_api import HeadHunterAPI
+from src.metrics import metrics
+
+
+def test_fetch_page_stage_counts_only_successful_responses():
+    synthetic = SyntheticHH(500, 3)
+    metrics.reset()
+    metrics.enable()
+    try:
+        with HHStubServer(synthetic, throttle_every=3) as stub, HeadHunterAPI(requests_per_second=None) as hh_api:
+            hh_api.url = stub.url
+            pages = [hh_api.get_page({'per_page': 100}, page) for page in range(5)]
+        snapshot = metrics.snapshot()
+    finally:
+        metrics.disable()
+        metrics.reset()
+
+    assert len(pages) == 5
+    assert snapshot['stages']['hh_fetch_page']['count'] == 5
+    assert snapshot['counters']['hh_fetch_retries'] >= 1
@@ -0,0 +1,65 @@
+import json
+from concurrent.futures import Future
+from itertools import chain
+from benchmarks.hh_stub import HHStubServer
+from benchmarks.synthetic import SyntheticHH
+from src.head_hunter_api import HeadHunterAPI
+from src.parallel_parser import ParallelParser
+
+
+def test_errors_report_request_params_of_page():
+    pages = [({'employer_id': '1', 'page': 0}, json.dumps({'items': [{'id': '1'}, {'name': 'без id'}]})),
+             ({'employer_id': '1', 'page': 1}, b'not json')]
+    with ParallelParser(1) as parser:
+        rows = parser.parse(pages)
+
+    assert [row[0] for row in rows] == [1]
+    assert [(error['page'], error['index']) for error in parser.errors] == [
+        ({'employer_id': '1', 'page': 0}, 1), ({'employer_id': '1', 'page': 1}, None)]
+
+
+def test_crawl_rows_load_into_storage_with_process_pool(db_manager):
+    synthetic = SyntheticHH(1500, 3)
+    employer_ids = synthetic.employer_ids()
+
+    with HHStubServer(synthetic) as stub, ParallelParser(2) as parser, \
+            HeadHunterAPI(requests_per_second=None, parser=parser) as hh_api:
+        hh_api.url = stub.url
+        loaded = db_manager.load_rows(chain.from_iterable(hh_api.iter_rows({'employer_id': employer_ids})))
+        stored_ids = [row[0] for row in db_manager._connection.execute(
+            "SELECT vacancy_id FROM vacancies ORDER BY vacancy_id")]
+
+    assert loaded == 1500
+    assert parser.errors == []
+    assert stored_ids == sorted(int(vacancy['id']) for vacancy in synthetic.vacancies())
+
+
+class RecordingExecutor:
+    """Исполнитель в текущем процессе, запоминающий переданные в пул страницы"""
+
+    def __init__(self):
+        self.submitted = []
+
+    def submit(self, fn, batch):
+        self.submitted.extend(page for _, page in batch)
+        future = Future()
+        future.set_result(fn(batch))
+        return future
+
+    def shutdown(self):
+        pass
+
+
+def test_decoded_pages_are_parsed_without_the_pool():
+    def page(first_id: int) -> dict:
+        return {'items': [{'id': str(first_id + index), 'name': 'Python'} for index in range(3)]}
+
+    pages = [({'page': 0}, page(0)), ({'page': 1}, json.dumps(page(3)).encode()),
+             ({'page': 0}, page(6)), ({'page': 1}, json.dumps(page(9)))]
+    parser = ParallelParser(2)
+    parser._executor = RecordingExecutor()
+
+    rows = parser.parse(pages)
+
+    assert sorted(row[0] for row in rows) == list(range(12))
+    assert parser._executor.submitted and all(not isinstance(page, dict) for page in parser._executor.submitted)
@@ -0,0 +1,75 @@
+from unittest import mock
+from src import query_cache
+from src.query_cache import QueryCache, cached_report
+
+
+class Reports:
+    """Минимальное хранилище с версией данных и счетчиком выполненных запросов"""
+
+    def __init__(self, cache: QueryCache):
+        self.query_cache = cache
+        self.data_version = 0
+        self.calls = 0
+
+    @cached_report
+    def search(self, keywords: list, match_all: bool = True) -> list:
+        self.calls += 1
+        return [(keyword, match_all, self.data_version) for keyword in keywords]
+
+
+def test_list_arguments_are_cached_by_value():
+    reports = Reports(QueryCache())
+
+    first = reports.search(['python', 'sql'])
+    assert reports.search(['python', 'sql']) is first
+    assert reports.search(['python', 'sql'], match_all=False) is not first
+    assert reports.search(['sql', 'python']) is not first
+    assert reports.calls == 3
+
+
+def test_new_data_version_invalidates_results():
+    reports = Reports(QueryCache())
+    reports.search(['python'])
+
+    reports.data_version += 1
+
+    assert reports.search(['python']) == [('python', True, 1)]
+    assert reports.calls == 2
+
+
+def test_entries_expire_after_ttl():
+    cache = QueryCache(ttl=10)
+    with mock.patch.object(query_cache.time, 'monotonic', return_value=100):
+        cache.put('report', [1], data_version=0)
+    with mock.patch.object(query_cache.time, 'monotonic', return_value=109):
+        assert cache.get('report', 0) == (True, [1])
+    with mock.patch.object(query_cache.time, 'monotonic', return_value=111):
+        assert cache.get('report', 0) == (False, None)
+    assert cache.stats()['entries'] == 0
+
+
+def test_max_entries_evicts_least_recently_used():
+    cache = QueryCache(max_entries=2)
+    cache.put('a', [1], 0)
+    cache.put('b', [2], 0)
+    cache.get('a', 0)
+
+    cache.put('c', [3], 0)
+
+    assert cache.get('b', 0) == (False, None)
+    assert cache.get('a', 0)[0] and cache.get('c', 0)[0]
+
+
+def test_max_bytes_evicts_oldest_and_skips_oversized_results():
+    def rows(count: int = 1) -> list:
+        return [('x' * 100,) for _ in range(count)]
+
+    row_size = QueryCache.estimate_size(rows())
+    cache = QueryCache(max_bytes=row_size * 2)
+    for key in 'abc':
+        cache.put(key, rows(), 0)
+    cache.put('huge', rows(10), 0)
+
+    assert [key for key in 'abc' if cache.get(key, 0)[0]] == ['b', 'c']
+    assert cache.get('huge', 0) == (False, None)
+    assert cache.stats()['bytes'] == row_size * 2
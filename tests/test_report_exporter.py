@@ -0,0 +1,33 @@
+import pytest
+from src.employer import Employer
+from src.report_exporter import ReportExporter
+from src.salary_range import SalaryRange
+from src.vacancy import Vacancy
+
+
+@pytest.fixture
+def vacancies_db(db_manager):
+    db_manager.load_database([
+        Vacancy(1, 'Python разработчик', 'https://api.hh.ru/vacancies/1', SalaryRange(100000, None),
+                Employer(10, 'Компания')),
+        Vacancy(2, 'Java разработчик', 'https://api.hh.ru/vacancies/2', SalaryRange(None, 150000),
+                Employer(10, 'Компания')),
+    ])
+    return db_manager
+
+
+def test_keyword_report_streams_search_results(vacancies_db, tmp_path):
+    exporter = ReportExporter(vacancies_db, 'csv', str(tmp_path / 'reports'))
+
+    assert exporter.export([("5", {'keywords': ['python']})]) == [("5", 1)]
+    assert list(vacancies_db.iter_search_vacancies(['разработчик'], itersize=1)) == \
+        vacancies_db.search_vacancies(['разработчик'])
+
+
+def test_unknown_report_fails_before_writing_files(vacancies_db, tmp_path):
+    output_dir = tmp_path / 'reports'
+    exporter = ReportExporter(vacancies_db, 'csv', str(output_dir))
+
+    with pytest.raises(ValueError):
+        exporter.export([("1", {}), ("9", {})])
+    assert list(output_dir.iterdir()) == []
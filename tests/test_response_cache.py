@@ -0,0 +1,64 @@
+import os
+import time
+from unittest import mock
+from benchmarks.hh_stub import HHStubServer
+from benchmarks.synthetic import SyntheticHH
+from src import response_cache
+from src.head_hunter_api import HeadHunterAPI
+from src.response_cache import ResponseCache
+
+PARAMS = {'per_page': 100}
+
+
+def crawl_first_page(cache: ResponseCache, stub: HHStubServer) -> dict:
+    with HeadHunterAPI(requests_per_second=None, cache=cache) as hh_api:
+        hh_api.url = stub.url
+        return hh_api.get_page(PARAMS, 0)
+
+
+def test_fresh_entry_is_served_without_request(tmp_path):
+    with HHStubServer(SyntheticHH(50, 2), etags=True) as stub:
+        cache = ResponseCache(str(tmp_path), ttl=3600)
+        page = crawl_first_page(cache, stub)
+        assert crawl_first_page(cache, stub) == page
+    assert stub.requests_count == 1
+
+
+def test_expired_entry_is_revalidated_with_etag(tmp_path):
+    with HHStubServer(SyntheticHH(50, 2), etags=True) as stub:
+        cache = ResponseCache(str(tmp_path), ttl=60)
+        page = crawl_first_page(cache, stub)
+        key = cache.make_key(stub.url, {**PARAMS, 'page': 0})
+        stored_at = cache.get(key)['stored_at']
+        with mock.patch.object(response_cache.time, 'time', return_value=stored_at + 120):
+            assert not cache.is_fresh(cache.get(key))
+            assert crawl_first_page(cache, stub) == page
+        assert cache.get(key)['stored_at'] == stored_at + 120
+    assert stub.requests_count == 2
+    assert stub.not_modified_count == 1
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    body = {'items': ['x' * 1000]}
+    cache = ResponseCache(str(tmp_path), max_size_bytes=2500)
+    cache.put('a', body)
+    cache.put('b', body)
+    now = time.time()
+    os.utime(cache._path('a'), (now - 20, now - 20))
+    os.utime(cache._path('b'), (now - 10, now - 10))
+    cache.get('a')
+
+    cache.put('c', body)
+
+    assert cache.get('b') is None
+    assert cache.get('a') is not None and cache.get('c') is not None
+
+
+def test_put_scans_directory_only_when_over_limit(tmp_path):
+    cache = ResponseCache(str(tmp_path), max_size_bytes=10 ** 6)
+    with mock.patch.object(response_cache.os, 'scandir', wraps=os.scandir) as scandir:
+        for key in range(20):
+            cache.put(str(key), {'items': [key]})
+        cache.put('0', {'items': [0]})
+    assert scandir.call_count == 0
+    assert cache._size == sum(entry.stat().st_size for entry in os.scandir(tmp_path))
@@ -0,0 +1,42 @@
+import random
+from src.employer import Employer
+from src.salary_index import SalaryIndex
+from src.salary_range import SalaryRange
+from src.utils import Utils
+from src.vacancy import Vacancy
+
+
+def random_vacancies(count: int, seed: int = 7) -> list[Vacancy]:
+    rnd = random.Random(seed)
+    employer = Employer(1, 'Компания')
+    vacancies = []
+    for idx in range(count):
+        salary_from = rnd.choice((None, rnd.randrange(20000, 400000, 10000)))
+        salary_to = rnd.choice((None, rnd.randrange(20000, 400000, 10000)))
+        # в том числе перепутанные границы: from_salary > to_salary
+        vacancies.append(Vacancy(idx, f'Вакансия {idx}', '', SalaryRange(salary_from, salary_to), employer))
+    return vacancies
+
+
+def test_inverted_salary_range_does_not_break_build():
+    vacancy = Vacancy(1, 'Вакансия', '', SalaryRange(300000, 100000), Employer(1, 'Компания'))
+
+    assert SalaryIndex([vacancy]).overlapping(150000, 200000) == [vacancy]
+
+
+def test_overlapping_matches_brute_force():
+    vacancies = random_vacancies(2000)
+    index = SalaryIndex(vacancies)
+    rnd = random.Random(11)
+    for _ in range(300):
+        low = rnd.randrange(0, 450000, 5000)
+        high = low + rnd.randrange(0, 150000, 5000)
+        expected = Utils.get_vacancies_by_salary(vacancies, range(low, high + 1))
+        assert [vacancy.id for vacancy in index.overlapping(low, high)] == [vacancy.id for vacancy in expected]
+
+
+def test_top_matches_sorted_slice():
+    vacancies = random_vacancies(2000)
+    expected = Utils.get_top_vacancies(Utils.sort_vacancies_by_salary(vacancies), 50)
+
+    assert [vacancy.id for vacancy in SalaryIndex(vacancies).top(50)] == [vacancy.id for vacancy in expected]
@@ -0,0 +1,36 @@
+from src.employer import Employer
+from src.salary_range import SalaryRange
+from src.vacancy import Vacancy
+
+
+def make_vacancy(salary_from, salary_to) -> Vacancy:
+    return Vacancy(1, 'Python разработчик', 'https://api.hh.ru/vacancies/1', SalaryRange(salary_from, salary_to),
+                   Employer(10, 'Компания'))
+
+
+def test_sync_detects_salary_moving_between_bounds(db_manager):
+    db_manager.load_database([make_vacancy(None, 100000)])
+
+    stats = db_manager.sync_database([make_vacancy(100000, None)])
+
+    assert stats['vacancies_changed'] == 1
+    assert db_manager._connection.execute(
+        "SELECT salary_from, salary_to FROM vacancies WHERE vacancy_id = 1").fetchone() == (100000, None)
+
+
+def test_sync_skips_unchanged_rows(db_manager):
+    db_manager.load_database([make_vacancy(100000, None)])
+
+    assert db_manager.sync_database([make_vacancy(100000, None)])['vacancies_changed'] == 0
+
+
+def test_vacancies_pages_keep_vacancies_without_salary_last(db_manager):
+    salaries = [None, 50000, None, 120000, 80000, 50000, None]
+    db_manager.load_rows((vacancy_id, 10 + vacancy_id % 2, f'Компания {vacancy_id % 2}', f'Вакансия {vacancy_id}',
+                          salary_from, None, f'https://api.hh.ru/vacancies/{vacancy_id}')
+                         for vacancy_id, salary_from in enumerate(salaries, 1))
+
+    rows = [row for page in db_manager.iter_vacancies_pages(page_size=2) for row in page]
+
+    assert [row[:3] for row in rows] == [row[:3] for row in db_manager.get_all_vacancies()]
+    assert [row[5] for row in rows] == [2, 6, 4, 5, 1, 3, 7]
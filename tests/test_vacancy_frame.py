@@ -0,0 +1,17 @@
+import numpy as np
+from src.vacancy_frame import VacancyFrame
+
+
+def random_frame(count: int, seed: int = 3) -> VacancyFrame:
+    rng = np.random.default_rng(seed)
+    # небольшой набор значений, чтобы на границе top_n были равные зарплаты
+    salaries = rng.choice([0, 100000, 150000, 200000, 250000], size=(count, 2))
+    return VacancyFrame.from_rows((idx, idx % 7, f'Компания {idx % 7}', f'Вакансия {idx}',
+                                   int(salary_from), int(salary_to), f'https://hh.ru/vacancy/{idx}')
+                                  for idx, (salary_from, salary_to) in enumerate(salaries))
+
+
+def test_top_matches_sorted_prefix_with_ties():
+    frame = random_frame(500)
+    for top_n in (1, 7, 50, 133, 499):
+        assert frame.top(top_n).ids.tolist() == frame.sort_by_salary().ids[:top_n].tolist()